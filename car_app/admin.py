@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Car, Sale, MonthlyExpense
+from .models import Car, Sale, MonthlyExpense, ExportJob, ArchivedCar, ArchivedSale, ArchivedMonthlyExpense
 
 
 @admin.register(Car)
@@ -21,3 +21,31 @@ class MonthlyExpenseAdmin(admin.ModelAdmin):
     list_display = ('description', 'amount', 'date', 'user')
     list_filter = ('date', 'user')
     search_fields = ('description', 'user__username')
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'status', 'user', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('user__username',)
+
+
+@admin.register(ArchivedCar)
+class ArchivedCarAdmin(admin.ModelAdmin):
+    list_display = ('chassis_number', 'car_type', 'year', 'purchase_value', 'user', 'archived_at')
+    list_filter = ('car_type', 'purchase_date')
+    search_fields = ('chassis_number', 'user__username')
+
+
+@admin.register(ArchivedSale)
+class ArchivedSaleAdmin(admin.ModelAdmin):
+    list_display = ('car', 'sale_date', 'sale_value', 'partial_profit', 'archived_at')
+    list_filter = ('sale_date',)
+    search_fields = ('car__chassis_number',)
+
+
+@admin.register(ArchivedMonthlyExpense)
+class ArchivedMonthlyExpenseAdmin(admin.ModelAdmin):
+    list_display = ('description', 'amount', 'date', 'user', 'archived_at')
+    list_filter = ('date',)
+    search_fields = ('description', 'user__username')
@@ -0,0 +1,107 @@
+"""
+سلسلة الأرباح والخسائر الشهرية للرسوم البيانية - تُقرأ من الملخص الشهري (المبني بـ TruncMonth)
+وتُحسب المجاميع التراكمية والمتوسطات المتحركة بعمليات مصفوفات NumPy على أعمدة مضغوطة
+"""
+import numpy as np
+
+from .archive import archive_rollups
+from .models import MonthlyRollup
+from .rollups import month_start
+
+# ترتيب صفوف المصفوفة: كل سلسلة صف وكل شهر عمود
+SERIES = ('revenue', 'cost_of_goods', 'partial_profit', 'expenses', 'net_profit')
+
+DEFAULT_WINDOW = 3
+MAX_WINDOW = 24
+
+
+def window_from(params, default=DEFAULT_WINDOW):
+    try:
+        window = int(params.get('window', default))
+    except (TypeError, ValueError):
+        return default
+    return min(max(window, 1), MAX_WINDOW)
+
+
+def _month_number(day):
+    return day.year * 12 + day.month - 1
+
+
+def _month_label(number):
+    return f'{number // 12:04d}-{number % 12 + 1:02d}'
+
+
+def _with_archive(rows, user, date_range):
+    """Add the archive's monthly totals to the rollup ``rows``, keeping them sorted by month."""
+    months = {row[0]: list(row[1:]) for row in rows}
+    for month, values in archive_rollups(user.pk).items():
+        if date_range and not month_start(date_range[0]) <= month <= date_range[1]:
+            continue
+        totals = months.setdefault(month, [0] * 4)
+        for index, field in enumerate(('revenue', 'total_profit', 'partial_profit', 'expense_total')):
+            totals[index] += values[field]
+    return [(month, *months[month]) for month in sorted(months)]
+
+
+def monthly_columns(user, date_range=None, include_archive=False):
+    """``(months, matrix)`` of ``user``'s monthly P&L, one matrix row per name in SERIES.
+
+    ``months`` are consecutive month numbers (year * 12 + month - 1) from
+    the first to the last month with data; months without rows are zeros
+    so the series can be accumulated and averaged. ``date_range`` keeps
+    the months that overlap it: the rollups hold whole months only.
+    The rollups cover the hot tables; ``include_archive`` adds the
+    archived months, aggregated from the archive tables.
+    """
+    rows = MonthlyRollup.objects.filter(user=user)
+    if date_range:
+        rows = rows.filter(month__gte=month_start(date_range[0]), month__lte=date_range[1])
+    rows = list(rows.order_by('month').values_list(
+        'month', 'revenue', 'total_profit', 'partial_profit', 'expense_total'))
+    if include_archive:
+        rows = _with_archive(rows, user, date_range)
+    if not rows:
+        return np.arange(0), np.zeros((len(SERIES), 0))
+
+    months, revenue, total_profit, partial_profit, expenses = zip(*rows)
+    numbers = np.fromiter((_month_number(month) for month in months), dtype=np.int64, count=len(rows))
+    values = np.array([revenue, total_profit, partial_profit, expenses], dtype=np.float64)
+
+    positions = numbers - numbers[0]
+    dense = np.zeros((4, positions[-1] + 1))
+    dense[:, positions] = values
+    revenue, total_profit, partial_profit, expenses = dense
+    matrix = np.vstack([
+        revenue,
+        revenue - total_profit,  # تكلفة السيارات المباعة
+        partial_profit,
+        expenses,
+        partial_profit - expenses,  # نفس صافي الربح في لوحة التحكم
+    ])
+    return np.arange(numbers[0], numbers[-1] + 1), matrix
+
+
+def moving_average(matrix, window):
+    """Trailing ``window``-month mean of every row; the first months average what exists so far."""
+    count = matrix.shape[1]
+    sums = np.zeros((matrix.shape[0], count + 1))
+    np.cumsum(matrix, axis=1, out=sums[:, 1:])
+    end = np.arange(1, count + 1)
+    start = np.maximum(end - window, 0)
+    return (sums[:, end] - sums[:, start]) / (end - start)
+
+
+def _columns(matrix):
+    return {name: np.round(row, 2).tolist() for name, row in zip(SERIES, matrix)}
+
+
+def pnl_series(user, date_range=None, window=DEFAULT_WINDOW, include_archive=False):
+    """JSON-ready monthly P&L series with running totals and moving averages."""
+    months, matrix = monthly_columns(user, date_range, include_archive)
+    return {
+        'months': [_month_label(number) for number in months.tolist()],
+        'window': window,
+        'series': _columns(matrix),
+        'running_total': _columns(np.cumsum(matrix, axis=1)),
+        'moving_average': _columns(moving_average(matrix, window)),
+    }
@@ -0,0 +1,160 @@
+"""
+الواجهة البرمجية REST (DRF) - الصفوف تُقرأ بـ values() وتُحوّل القيم في SQL
+(التاريخ نص ISO والمبالغ أرقام عشرية) فلا تُبنى كائنات نماذج ولا Decimal لكل صف
+"""
+from abc import ABCMeta, abstractmethod
+
+from django.db.models import CharField, FloatField
+from django.db.models.functions import Cast
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .conditional import conditional_on_user_data
+from .filters import filter_cars, filter_sales
+from .models import CAR_TYPE_LABELS, STATUS_LABELS
+from .pagination import CURSOR_PARAM, InvalidCursor, api_page, ordering_for, page_size_from, paginate
+
+
+class UnknownFields(ValueError):
+    def __init__(self, names):
+        super().__init__(names)
+        self.names = names
+
+
+def iso_date(field):
+    return Cast(field, CharField())
+
+
+def number(field):
+    return Cast(field, FloatField())
+
+
+class ValuesListAPIView(APIView, metaclass=ABCMeta):
+    """Paginated list endpoint that serializes ``values()`` rows instead of model instances.
+
+    Abstract: subclasses define ``columns`` and implement ``get_queryset()``.
+
+    ``columns`` are ``(name, source, labels)``: ``source`` is a field path
+    or an expression evaluated in SQL, and ``labels`` an optional
+    code-to-label map. ``?fields=`` limits the columns that are queried
+    and returned. ``orderings`` maps ``?ordering=`` values to
+    ``order_by`` fields; the default is the filtered queryset's ordering.
+    """
+    authentication_classes = [SessionAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer]
+    columns = ()
+    orderings = {}
+
+    @abstractmethod
+    def get_queryset(self):
+        """The filtered queryset of the requesting user's rows."""
+
+    def get_columns(self):
+        """Columns named in ``?fields=a,b``, or all of them; raises UnknownFields for other names."""
+        names = [name for name in self.request.query_params.get('fields', '').split(',') if name]
+        if not names:
+            return list(self.columns)
+        known = {column[0] for column in self.columns}
+        unknown = [name for name in names if name not in known]
+        if unknown:
+            raise UnknownFields(unknown)
+        return [column for column in self.columns if column[0] in names]
+
+    def get_rows(self, columns):
+        queryset = self.get_queryset()
+        ordering = self.orderings.get(self.request.query_params.get('ordering'))
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+
+        fields = []
+        expressions = {}
+        for name, source, _ in columns:
+            if isinstance(source, str):
+                fields.append(source)
+            else:
+                expressions[f'api_{name}'] = source
+        # حقول الترتيب تُقرأ أيضاً ليُبنى منها مؤشر الصفحة التالية
+        for field in ordering_for(queryset):
+            if field.lstrip('-') not in fields:
+                fields.append(field.lstrip('-'))
+        return queryset.values(*fields, **expressions)
+
+    def serialize(self, rows, columns):
+        keys = [(name, source if isinstance(source, str) else f'api_{name}', labels)
+                for name, source, labels in columns]
+        return [
+            {name: labels.get(row[key], row[key]) if labels else row[key] for name, key, labels in keys}
+            for row in rows
+        ]
+
+    def get(self, request):
+        try:
+            columns = self.get_columns()
+        except UnknownFields as e:
+            return Response({'error': f'حقول غير معروفة: {", ".join(e.names)}', 'fields': e.names}, status=400)
+        try:
+            page = paginate(self.get_rows(columns), request.query_params.get(CURSOR_PARAM),
+                            page_size_from(request.query_params))
+        except InvalidCursor:
+            return Response({'error': 'مؤشر الصفحة غير صالح'}, status=400)
+        response = Response(api_page(request, page, self.serialize(page.items, columns)))
+        response.add_post_render_callback(_release_data)
+        return response
+
+
+def _release_data(response):
+    # العرض والاستجابة يشيران لبعضهما فلا تُحرر الصفوف إلا عند جمع الدورات؛ بعد بناء JSON لا حاجة لها
+    response.data = None
+
+
+class CarList(ValuesListAPIView):
+    columns = (
+        ('id', 'id', None),
+        ('car_type', 'car_type', CAR_TYPE_LABELS),
+        ('year', 'year', None),
+        ('chassis_number', 'chassis_number', None),
+        ('purchase_date', iso_date('purchase_date'), None),
+        ('purchase_value', number('purchase_value'), None),
+        ('status', 'status', STATUS_LABELS),
+    )
+    orderings = {
+        'purchase_date': ('purchase_date',),
+        '-purchase_date': ('-purchase_date',),
+        'purchase_value': ('purchase_value',),
+        '-purchase_value': ('-purchase_value',),
+        'year': ('year',),
+        '-year': ('-year',),
+    }
+
+    def get_queryset(self):
+        return filter_cars(self.request.user, self.request.query_params)
+
+
+class SaleList(ValuesListAPIView):
+    columns = (
+        ('id', 'id', None),
+        ('car', 'car__car_type', CAR_TYPE_LABELS),
+        ('chassis_number', 'car__chassis_number', None),
+        ('sale_date', iso_date('sale_date'), None),
+        ('sale_value', number('sale_value'), None),
+        ('purchase_value', number('car__purchase_value'), None),
+        ('total_profit', number('total_profit'), None),
+        ('partial_profit', number('partial_profit'), None),
+    )
+    orderings = {
+        'sale_date': ('sale_date',),
+        '-sale_date': ('-sale_date',),
+        'sale_value': ('sale_value',),
+        '-sale_value': ('-sale_value',),
+    }
+
+    def get_queryset(self):
+        return filter_sales(self.request.user, self.request.query_params)
+
+
+api_car_list = conditional_on_user_data(CarList.as_view())
+api_sales_list = conditional_on_user_data(SaleList.as_view())
@@ -5,3 +5,6 @@ class CarAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'car_app'
     verbose_name = 'تطبيق إدارة السيارات'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,89 @@
+"""
+تشكيل النصوص العربية للـ PDF مع تخزين مؤقت للنصوص المتكررة
+"""
+from functools import lru_cache
+
+import arabic_reshaper
+from bidi.algorithm import get_display
+
+from .models import CAR_TYPE_LABELS, CLEARANCE_LABELS, STATUS_LABELS
+
+# الحد الأقصى للنصوص الحرة (أسماء السيارات مثلاً) المحفوظة في الذاكرة
+SHAPE_CACHE_SIZE = 4096
+
+_label_hits = 0
+
+
+def _shape(text):
+    try:
+        # تطبيق arabic_reshaper و bidi
+        reshaped = arabic_reshaper.reshape(text)
+        return get_display(reshaped)
+    except Exception:
+        # إذا فشل، أرجع النص الأصلي
+        return text
+
+
+_shape_cached = lru_cache(maxsize=SHAPE_CACHE_SIZE)(_shape)
+
+# جدول التسميات الثابتة (الخيارات وعناوين الأعمدة) مشكّلة مرة واحدة
+SHAPED_LABELS = {}
+
+
+def precompute_labels(*groups):
+    """Shape every text in ``groups`` once and keep it for the process lifetime."""
+    for texts in groups:
+        for text in texts:
+            if text and text not in SHAPED_LABELS:
+                SHAPED_LABELS[text] = _shape(text)
+
+
+precompute_labels(CAR_TYPE_LABELS.values(), CLEARANCE_LABELS.values(), STATUS_LABELS.values())
+
+
+def reshape_arabic_text(text):
+    """Reshape Arabic text for proper display in PDF"""
+    global _label_hits
+    if not text:
+        return text
+    shaped = SHAPED_LABELS.get(text)
+    if shaped is not None:
+        _label_hits += 1
+        return shaped
+    return _shape_cached(text)
+
+
+def shape_column(values):
+    """Shape a whole column of cell values in one call.
+
+    Each distinct value is shaped (or looked up) only once per call, which
+    is what makes repeated names within a page or batch cheap.
+    """
+    shaped = {}
+    result = []
+    for value in values:
+        if value not in shaped:
+            shaped[value] = reshape_arabic_text(value)
+        result.append(shaped[value])
+    return result
+
+
+def cache_stats():
+    """Return hit/miss counters for the label table and the free-text LRU cache."""
+    info = _shape_cached.cache_info()
+    return {
+        'labels': {'size': len(SHAPED_LABELS), 'hits': _label_hits},
+        'lru': {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize,
+        },
+    }
+
+
+def clear_cache():
+    """Reset the free-text cache and the counters (the label table is kept)."""
+    global _label_hits
+    _label_hits = 0
+    _shape_cached.cache_clear()
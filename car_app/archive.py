@@ -0,0 +1,191 @@
+"""
+أرشفة البيانات القديمة - السيارات المباعة مع مبيعاتها والمصروفات الأقدم من تاريخ القطع تُنقل
+إلى جداول الأرشيف، فتبقى الصفحات ولوحة التحكم على الجداول الحالية الصغيرة،
+والتقارير تضم الأرشيف عند الطلب (?archive=1) باستعلام UNION ALL
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .filters import car_filters, filter_cars, filter_expenses, filter_sales
+from .models import ArchivedCar, ArchivedMonthlyExpense, ArchivedSale, Car, MonthlyExpense, Sale
+from .rollups import compute_rollups
+from .search import contains_cars
+from .signals import batched_updates
+
+# عدد السيارات أو المصروفات في كل معاملة نقل
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def _copied_fields(archive_model):
+    return [field.attname for field in archive_model._meta.concrete_fields if field.name != 'archived_at']
+
+
+CAR_FIELDS = _copied_fields(ArchivedCar)
+SALE_FIELDS = _copied_fields(ArchivedSale)
+EXPENSE_FIELDS = _copied_fields(ArchivedMonthlyExpense)
+
+ArchiveResult = namedtuple('ArchiveResult', 'cars expenses')
+
+
+def archive_cutoff(days=None):
+    """The date before which rows are archived: ``days`` (default ``ARCHIVE_AFTER_DAYS``) before today."""
+    if days is None:
+        days = getattr(settings, 'ARCHIVE_AFTER_DAYS', 2 * 365)
+    return timezone.localdate() - timedelta(days=days)
+
+
+def archivable_cars(cutoff, user_id=None):
+    """Sold cars whose sale is dated before ``cutoff``, oldest sale first."""
+    cars = Car.objects.filter(status='sold', sale__sale_date__lt=cutoff).order_by('sale__sale_date', 'id')
+    return cars.filter(user_id=user_id) if user_id is not None else cars
+
+
+def archivable_expenses(cutoff, user_id=None):
+    """Expenses dated before ``cutoff``, oldest first."""
+    expenses = MonthlyExpense.objects.filter(date__lt=cutoff).order_by('date', 'id')
+    return expenses.filter(user_id=user_id) if user_id is not None else expenses
+
+
+def _copy(rows, archive_model, fields):
+    archive_model.objects.bulk_create([archive_model(**row) for row in rows.values(*fields)])
+
+
+def _move_batch(user_id, rows, batch_size, move):
+    """Run ``move(ids)`` for the next ``batch_size`` ids of ``rows`` in one transaction; return how many.
+
+    ``rows`` are taken in date order so a batch spans a few months and
+    the rollup refresh at the end of the batch stays small.
+    """
+    with transaction.atomic(), batched_updates(user_id, tombstone_op='archive'):
+        ids = list(rows.values_list('id', flat=True)[:batch_size])
+        if ids:
+            move(ids)
+    return len(ids)
+
+
+def _move_cars(ids):
+    _copy(Car.objects.filter(id__in=ids), ArchivedCar, CAR_FIELDS)
+    _copy(Sale.objects.filter(car_id__in=ids), ArchivedSale, SALE_FIELDS)
+    # الحذف يمر بالإشارات داخل الدفعة: سجل "archive" للمزامنة، إزالة البحث، الملخص الشهري ونسخة البيانات
+    Car.objects.filter(id__in=ids).delete()
+
+
+def _move_expenses(ids):
+    _copy(MonthlyExpense.objects.filter(id__in=ids), ArchivedMonthlyExpense, EXPENSE_FIELDS)
+    MonthlyExpense.objects.filter(id__in=ids).delete()
+
+
+def archive_user(user_id, cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move ``user_id``'s cars sold before ``cutoff`` (with their sales) and older expenses to the archive.
+
+    Rows are copied with their ids and deleted from the hot tables in
+    batches of ``batch_size``, each in its own transaction, so an
+    interrupted run leaves every row in exactly one table and can simply
+    be started again. The hot tables keep the usual side effects of a
+    delete: the rollups and the dashboard then cover the hot rows only.
+    Sync clients get an "archive" tombstone rather than a "delete" one.
+    """
+    cars = expenses = 0
+    while True:
+        moved = _move_batch(user_id, archivable_cars(cutoff, user_id), batch_size, _move_cars)
+        cars += moved
+        if moved < batch_size:
+            break
+    while True:
+        moved = _move_batch(user_id, archivable_expenses(cutoff, user_id), batch_size, _move_expenses)
+        expenses += moved
+        if moved < batch_size:
+            break
+    return ArchiveResult(cars, expenses)
+
+
+def include_archive(params):
+    """True when a report asked for the archive too (``?archive=1``)."""
+    return params.get('archive') in ('1', 'true')
+
+
+class ArchiveUnion:
+    """The hot and archived rows of a report as one ``UNION ALL`` query.
+
+    Stands in for the hot queryset where the exports read it:
+    ``values_list(*fields)`` returns rows from both tables, sorted the way
+    the hot queryset is (or by the model's default ordering when that
+    order is on an annotation such as the search rank), and ``count()``
+    counts both.
+    """
+
+    def __init__(self, hot, archived):
+        self.hot = hot
+        self.archived = archived
+
+    def ordering(self):
+        ordering = list(self.hot.query.order_by or self.hot.model._meta.ordering)
+        if any(name.lstrip('-') in self.hot.query.annotations for name in ordering):
+            ordering = list(self.hot.model._meta.ordering)
+        return ordering
+
+    def values_list(self, *fields):
+        return UnionRows(self, fields)
+
+    def count(self):
+        return self.hot.count() + self.archived.count()
+
+
+class UnionRows:
+    """``values_list`` rows of an ArchiveUnion; read with ``iterator()``."""
+
+    def __init__(self, union, fields):
+        self.union = union
+        self.fields = list(fields)
+
+    def query(self):
+        ordering = self.union.ordering()
+        # الترتيب في UNION بأسماء أعمدة النتيجة، فتُضاف حقول الترتيب الناقصة ثم تُحذف من كل صف
+        columns = self.fields + [name.lstrip('-') for name in ordering if name.lstrip('-') not in self.fields]
+        hot = self.union.hot.order_by().values_list(*columns)
+        archived = self.union.archived.order_by().values_list(*columns)
+        return hot.union(archived, all=True).order_by(*ordering)
+
+    def iterator(self, chunk_size=None):
+        width = len(self.fields)
+        for row in self.query().iterator(chunk_size=chunk_size):
+            yield row[:width]
+
+    def __iter__(self):
+        return self.iterator()
+
+
+def with_archive(params, hot, archived):
+    """``hot``, or ``hot`` together with ``archived`` when the report opted in to the archive."""
+    return ArchiveUnion(hot, archived) if include_archive(params) else hot
+
+
+def archived_cars(user, params):
+    """Archived cars filtered like ``filter_cars``; the archive is not in the FTS index."""
+    search = car_filters(params)['search']
+    cars = filter_cars(user, {**dict(params.items()), 'search': ''}, queryset=ArchivedCar.objects.all())
+    return contains_cars(cars, search) if search else cars
+
+
+def report_cars(user, params):
+    return with_archive(params, filter_cars(user, params), archived_cars(user, params))
+
+
+def report_sales(user, params):
+    return with_archive(params, filter_sales(user, params), filter_sales(user, params, ArchivedSale.objects.all()))
+
+
+def report_expenses(user, params):
+    return with_archive(params, filter_expenses(user, params),
+                        filter_expenses(user, params, ArchivedMonthlyExpense.objects.all()))
+
+
+def archive_rollups(user_id):
+    """``{month: values}`` aggregated from ``user_id``'s archive, in the MonthlyRollup fields."""
+    rows = compute_rollups(user_id, car_model=ArchivedCar, sale_model=ArchivedSale,
+                           expense_model=ArchivedMonthlyExpense)
+    return {month: values for (_, month), values in rows.items()}
@@ -0,0 +1,148 @@
+"""
+عمليات جماعية على سيارات ومبيعات ومصروفات المستخدم - كل طلب في معاملة واحدة
+بـ bulk_create و QuerySet.update، مع نتيجة لكل عنصر وتحديث الفهرس والملخص ونسخة البيانات مرة واحدة
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .forms import MonthlyExpenseForm, SaleForm
+from .models import Car, MonthlyExpense, Sale
+from .signals import batched_updates
+
+# أكبر عدد من العناصر في طلب واحد
+BULK_MAX_ITEMS = 1000
+
+
+class BulkRequestError(ValueError):
+    """The request body is not a list of items this operation accepts."""
+
+
+def _items(payload, key):
+    items = payload.get(key) if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        raise BulkRequestError(f'يجب إرسال قائمة "{key}"')
+    if len(items) > BULK_MAX_ITEMS:
+        raise BulkRequestError(f'الحد الأقصى {BULK_MAX_ITEMS} عنصر في الطلب الواحد')
+    return items
+
+
+def _ids(payload):
+    ids = _items(payload, 'ids')
+    if not all(isinstance(item_id, int) and not isinstance(item_id, bool) for item_id in ids):
+        raise BulkRequestError('يجب أن تكون "ids" أرقاماً صحيحة')
+    return ids
+
+
+def _result(index, status, **extra):
+    return {'index': index, 'status': status, **extra}
+
+
+def _form_errors(form):
+    return {field: [str(message) for message in messages] for field, messages in form.errors.items()}
+
+
+def sell_cars(user, payload):
+    """Record a sale for each ``{"car_id", "sale_date", "sale_value", "partial_profit"}`` item.
+
+    Every car must belong to ``user`` and still be available. The sales are
+    inserted with ``bulk_create`` and the cars marked sold with one
+    ``UPDATE``, all in one transaction.
+    """
+    items = _items(payload, 'items')
+    car_ids = [item.get('car_id') for item in items if isinstance(item, dict)]
+    cars = Car.objects.filter(user=user, id__in=[car_id for car_id in car_ids if isinstance(car_id, int)])
+    cars = cars.in_bulk()
+    sold = set(Sale.objects.filter(car_id__in=list(cars)).values_list('car_id', flat=True))
+
+    results = []
+    sales = []
+    for index, item in enumerate(items):
+        car = cars.get(item.get('car_id')) if isinstance(item, dict) else None
+        if car is None:
+            results.append(_result(index, 'error', errors={'car_id': ['السيارة غير موجودة']}))
+            continue
+        if car.pk in sold or car.status == 'sold':
+            results.append(_result(index, 'error', errors={'car_id': ['السيارة مباعة بالفعل']}))
+            continue
+        form = SaleForm(item)
+        if not form.is_valid():
+            results.append(_result(index, 'error', errors=_form_errors(form)))
+            continue
+        sale = form.save(commit=False)
+        sale.car = car
+        # bulk_create لا يستدعي save()، لذلك يُحسب الربح المخزن هنا
+        sale.total_profit = sale.compute_total_profit()
+        sold.add(car.pk)
+        sales.append(sale)
+        results.append(_result(index, 'sold', car_id=car.pk))
+
+    if sales:
+        with transaction.atomic(), batched_updates(user.pk) as batch:
+            Sale.objects.bulk_create(sales)
+            Car.objects.filter(id__in=[sale.car_id for sale in sales]).update(
+                status='sold', updated_at=timezone.now())
+            # السيارة المباعة تُحسب في شهر شرائها والبيع في شهر البيع
+            batch.touch(*[sale.sale_date for sale in sales], *[sale.car.purchase_date for sale in sales])
+        sale_ids = {sale.car_id: sale.pk for sale in sales}
+        for result in results:
+            if result['status'] == 'sold':
+                result['id'] = sale_ids[result['car_id']]
+    return results
+
+
+def _delete(user, payload, model):
+    ids = _ids(payload)
+    with transaction.atomic(), batched_updates(user.pk):
+        # الرقم المكرر في الطلب يُحذف مرة واحدة ويُبلّغ عنه كمحذوف في كل موضع
+        rows = model.objects.filter(user=user, id__in=set(ids))
+        found = set(rows.values_list('id', flat=True))
+        # الحذف يمر بالإشارات (ومنها حذف المبيعات التابعة)، والدفعة تجمع أعمالها لتُنفذ مرة واحدة
+        rows.delete()
+
+    return [
+        _result(index, 'deleted', id=item_id) if item_id in found
+        else _result(index, 'error', id=item_id, errors={'id': ['العنصر غير موجود']})
+        for index, item_id in enumerate(ids)
+    ]
+
+
+def delete_cars(user, payload):
+    """Delete the cars (and their sales) listed in ``{"ids": [...]}``."""
+    return _delete(user, payload, Car)
+
+
+def delete_expenses(user, payload):
+    """Delete the expenses listed in ``{"ids": [...]}``."""
+    return _delete(user, payload, MonthlyExpense)
+
+
+def add_expenses(user, payload):
+    """Create one expense per ``{"description", "amount", "date"}`` item with ``bulk_create``."""
+    items = _items(payload, 'items')
+    results = []
+    expenses = []
+    for index, item in enumerate(items):
+        form = MonthlyExpenseForm(item if isinstance(item, dict) else {})
+        if not form.is_valid():
+            results.append(_result(index, 'error', errors=_form_errors(form)))
+            continue
+        expense = form.save(commit=False)
+        expense.user = user
+        expenses.append((index, expense))
+        results.append(_result(index, 'created'))
+
+    if expenses:
+        with transaction.atomic(), batched_updates(user.pk) as batch:
+            MonthlyExpense.objects.bulk_create([expense for _, expense in expenses])
+            batch.touch(*[expense.date for _, expense in expenses])
+        for index, expense in expenses:
+            results[index]['id'] = expense.pk
+    return results
+
+
+BULK_OPERATIONS = {
+    'sell_cars': sell_cars,
+    'delete_cars': delete_cars,
+    'delete_expenses': delete_expenses,
+    'add_expenses': add_expenses,
+}
@@ -0,0 +1,174 @@
+"""
+ضغط الاستجابات بـ Brotli أو gzip حسب Accept-Encoding - للواجهات البرمجية وصفحات HTML
+وملفات التصدير النصية، مع تجاوز الملفات المضغوطة أصلاً (PDF و XLSX) والاستجابات الصغيرة
+
+هجوم BREACH: حجم الاستجابة المضغوطة يكشف سراً فيها (رمز CSRF) إذا عكست الصفحة نفسها مدخلات المهاجم
+(مثل نص البحث). لذلك لا تُضغط أي استجابة تحمل رمز CSRF - النماذج وصفحات القوائم التي فيها أزرار حذف -
+وتبقى مضغوطة ملفات التصدير والواجهات البرمجية وهي معظم الحجم. لم نستخدم حشو الطول العشوائي لأنه يُضعف
+الهجوم فقط ولا يمنعه.
+"""
+import gzip
+import logging
+import re
+import zlib
+from threading import Lock
+
+import brotli
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+logger = logging.getLogger(__name__)
+
+# أنواع محتوى مضغوطة بطبيعتها، ضغطها مرة أخرى يضيع وقت المعالج بلا فائدة
+COMPRESSED_CONTENT_TYPES = (
+    'application/pdf',
+    'application/vnd.openxmlformats-officedocument.',
+    'application/zip',
+    'application/gzip',
+    'image/',
+    'audio/',
+    'video/',
+    'font/woff',
+)
+
+_ACCEPT_ENCODING = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*(?:,|$)')
+
+_stats_lock = Lock()
+_stats = {'responses': 0, 'original_bytes': 0, 'compressed_bytes': 0}
+
+
+def compression_stats():
+    """Totals since the process started: responses compressed, bytes before and after."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['saved_bytes'] = stats['original_bytes'] - stats['compressed_bytes']
+    return stats
+
+
+def _record(path, encoding, original, compressed):
+    with _stats_lock:
+        _stats['responses'] += 1
+        _stats['original_bytes'] += original
+        _stats['compressed_bytes'] += compressed
+    logger.debug('%s %s: %d -> %d bytes (%d saved)', path, encoding, original, compressed, original - compressed)
+
+
+def _min_bytes():
+    return getattr(settings, 'COMPRESSION_MIN_BYTES', 860)
+
+
+def _brotli_quality():
+    # الجودة 11 (الافتراضية) بطيئة جداً للاستجابات الحية، 5 قريبة من gzip في السرعة وأصغر حجماً
+    return getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+
+
+def _gzip_level():
+    return getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6)
+
+
+def choose_encoding(accept_encoding):
+    """'br', 'gzip' or None for an Accept-Encoding header; Brotli wins a tie."""
+    weights = {}
+    for token, quality in _ACCEPT_ENCODING.findall(accept_encoding or ''):
+        try:
+            weights[token.lower()] = float(quality) if quality else 1.0
+        except ValueError:
+            continue
+    wildcard = weights.get('*', 0)
+    best = None
+    for encoding in ('br', 'gzip'):
+        weight = weights.get(encoding, wildcard)
+        if weight > 0 and (best is None or weight > best[1]):
+            best = (encoding, weight)
+    return best[0] if best else None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=_brotli_quality())
+    return gzip.compress(data, compresslevel=_gzip_level(), mtime=0)
+
+
+def _compress_stream(chunks, encoding, path):
+    """Compress ``chunks`` as they are produced, flushing after each so streaming stays incremental."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=_brotli_quality())
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(_gzip_level(), zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        process, finish = compressor.compress, compressor.flush
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)  # noqa: E731
+    original = compressed = 0
+    for chunk in chunks:
+        original += len(chunk)
+        data = process(chunk) + flush()
+        compressed += len(data)
+        if data:
+            yield data
+    data = finish()
+    compressed += len(data)
+    yield data
+    _record(path, encoding, original, compressed)
+
+
+def _skip(response):
+    if response.has_header('Content-Encoding') or response.status_code < 200 or response.status_code == 204:
+        return True
+    content_type = response.get('Content-Type', '')
+    return content_type.startswith(COMPRESSED_CONTENT_TYPES)
+
+
+def _carries_csrf_token(request, response):
+    """True when the body may contain a CSRF token (get_token() was called while building it)."""
+    # get_token() يطلب تجديد الكوكي، فيضعها CsrfViewMiddleware في الاستجابة ثم يمسح العلامة
+    return settings.CSRF_COOKIE_NAME in response.cookies or bool(request.META.get('CSRF_COOKIE_NEEDS_UPDATE'))
+
+
+class CompressionMiddleware:
+    """Compress responses with Brotli or gzip, whichever the client prefers.
+
+    Regular responses smaller than ``COMPRESSION_MIN_BYTES`` are sent as
+    they are, as is any compressed body that would not be smaller.
+    Streaming responses (CSV/NDJSON exports, cached files) are compressed
+    chunk by chunk. PDF, XLSX and other already-compressed types are
+    skipped, and so is any response carrying a CSRF token, because
+    compressing a secret next to reflected input exposes it to BREACH
+    (see the module docstring). Totals of the bytes saved are kept in ``compression_stats()``
+    and each response is logged at debug level.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if _skip(response) or _carries_csrf_token(request, response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                return response
+            response.streaming_content = _compress_stream(response.streaming_content, encoding, request.path)
+            # الحجم بعد الضغط غير معروف قبل انتهاء البث
+            response.headers.pop('Content-Length', None)
+        else:
+            original = len(response.content)
+            if original < _min_bytes():
+                return response
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= original:
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+            _record(request.path, encoding, original, len(compressed))
+
+        # المحتوى المضغوط يختلف بايت ببايت عن الأصلي، فيصبح ETag القوي ضعيفاً
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
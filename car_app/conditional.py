@@ -0,0 +1,64 @@
+"""
+طلبات GET الشرطية (ETag / Last-Modified) مبنية على رقم نسخة بيانات المستخدم،
+فيُرد 304 دون بناء أي استعلام إذا لم تتغير البيانات منذ آخر طلب
+"""
+import hashlib
+from functools import wraps
+
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import DataVersion
+
+
+def user_data_version(request):
+    """``(version, updated_at)`` of the requesting user's data, read once per request."""
+    if not hasattr(request, '_data_version'):
+        request._data_version = (
+            DataVersion.objects.filter(user_id=request.user.pk).values_list('version', 'updated_at').first()
+            or (0, None)
+        )
+    return request._data_version
+
+
+def _queues_job(request):
+    # ?async=1 يرجع حالة مهمة جديدة وليس محتوى التصدير
+    return request.GET.get('async') == '1'
+
+
+def _skip(request):
+    # طلبات الواجهة البرمجية بلا تسجيل دخول ترفضها صلاحيات DRF
+    return _queues_job(request) or not request.user.is_authenticated
+
+
+def data_etag(request, *args, **kwargs):
+    """Weak ETag from the user, their data version and the full URL (filters change the body)."""
+    if _skip(request):
+        return None
+    version, _ = user_data_version(request)
+    variant = hashlib.sha1(request.get_full_path().encode('utf-8')).hexdigest()[:16]
+    return f'W/"{request.user.pk}-{version}-{variant}"'
+
+
+def data_last_modified(request, *args, **kwargs):
+    if _skip(request):
+        return None
+    return user_data_version(request)[1]
+
+
+def conditional_on_user_data(view):
+    """Answer GET/HEAD with 304 when the user's data has not changed since the client's copy.
+
+    Apply under ``login_required``. Responses are marked private and must
+    be revalidated, so clients keep a copy but always ask before using it.
+    """
+    conditional_view = condition(etag_func=data_etag, last_modified_func=data_last_modified)(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        if not _queues_job(request):
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    return wrapper
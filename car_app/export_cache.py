@@ -0,0 +1,171 @@
+"""
+ذاكرة تخزين ملفات التصدير على القرص - مفتاحها المستخدم والتصفية ونسخة البيانات وصيغة الملفات
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+from .exports import EXPORT_KINDS, export_params, spooled_export, write_export
+from .models import DataVersion
+
+# رقم صيغة الملفات: يُزاد مع كل تغيير في شكل ملفات Excel أو PDF فلا تُخدم الملفات القديمة بعد النشر
+EXPORT_CACHE_FORMAT = 1
+
+# أقصى مدة بين فحصين كاملين لحجم المجلد؛ عمليات الخادم الأخرى تضيف ملفات لا تراها هذه العملية
+EVICT_INTERVAL = 5 * 60
+
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+# تقدير حجم المجلد في هذه العملية منذ آخر فحص كامل (None قبل أول فحص)
+_size = {'bytes': None, 'checked_at': 0.0}
+
+
+def _cache_dir():
+    return settings.EXPORT_CACHE_DIR
+
+
+def _max_bytes():
+    return getattr(settings, 'EXPORT_CACHE_MAX_BYTES', 0)
+
+
+def _count(name, amount=1):
+    with _lock:
+        _stats[name] += amount
+
+
+def normalize_params(params):
+    """Canonical form of the filter parameters so equivalent URLs share a key."""
+    params = {key: value.strip() for key, value in export_params(params).items() if value.strip()}
+    for key in ('month', 'year'):
+        if key in params:
+            try:
+                params[key] = str(int(params[key]))
+            except ValueError:
+                pass
+    # نطاق التاريخ يُهمل إذا لم يُعطَ طرفاه معاً
+    if not (params.get('start_date') and params.get('end_date')):
+        params.pop('start_date', None)
+        params.pop('end_date', None)
+    return params
+
+
+def cache_key(user_id, kind, params, version):
+    payload = json.dumps(
+        {'format': EXPORT_CACHE_FORMAT, 'user': user_id, 'kind': kind, 'params': normalize_params(params),
+         'version': version},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _path(key, kind):
+    _, ext = os.path.splitext(EXPORT_KINDS[kind].filename)
+    return os.path.join(_cache_dir(), key[:2], key + ext)
+
+
+def _evict():
+    """Delete least recently used files until the cache fits its size limit; return the remaining size."""
+    entries = []
+    total = 0
+    for root, _, files in os.walk(_cache_dir()):
+        for name in files:
+            if name.endswith('.tmp'):
+                # ملف قيد الكتابة من عملية أخرى
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    limit = _max_bytes()
+    entries.sort()
+    for _, size, path in entries:
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        _count('evictions')
+    return total
+
+
+def _stored(size):
+    """Account for a new file of ``size`` bytes and evict once the cache may be over its limit.
+
+    The directory is only walked when this process's running estimate
+    goes over the limit, or every EVICT_INTERVAL seconds, instead of on
+    every store.
+    """
+    with _lock:
+        if _size['bytes'] is not None:
+            _size['bytes'] += size
+        due = (_size['bytes'] is None or _size['bytes'] > _max_bytes()
+               or time.monotonic() - _size['checked_at'] > EVICT_INTERVAL)
+        if due:
+            # فحص واحد في كل مرة؛ الطلبات الأخرى تكمل بالتقدير الحالي
+            _size['checked_at'] = time.monotonic()
+    if due:
+        total = _evict()
+        with _lock:
+            _size['bytes'] = total
+
+
+def open_export(kind, user, params, version=None):
+    """Return an open binary file holding export ``kind`` for ``user``.
+
+    A repeat request for the same user, filters and data version is served
+    from disk without running any export query. Otherwise the export is
+    rendered straight into the cache directory and kept for next time.
+    ``version`` is the user's data version when the caller already read it.
+    """
+    if _max_bytes() <= 0:
+        return spooled_export(write_export, kind, user, export_params(params))
+
+    if version is None:
+        version = DataVersion.current(user.pk)
+    key = cache_key(user.pk, kind, params, version)
+    path = _path(key, kind)
+    try:
+        cached = open(path, 'rb')
+    except FileNotFoundError:
+        pass
+    else:
+        _count('hits')
+        # تحديث وقت التعديل ليُعامل الملف كأحدث استخدام
+        os.utime(path)
+        return cached
+
+    _count('misses')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            write_export(kind, user, export_params(params), output)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _count('stores')
+    output = open(path, 'rb')
+    _stored(os.fstat(output.fileno()).st_size)
+    return output
+
+
+def stats():
+    """Per-process hit/miss counters and the resulting hit rate."""
+    with _lock:
+        data = dict(_stats)
+    lookups = data['hits'] + data['misses']
+    data['hit_rate'] = data['hits'] / lookups if lookups else 0.0
+    return data
@@ -0,0 +1,643 @@
+"""
+محرك التصدير - كتابة ملفات Excel و PDF بذاكرة ثابتة مهما كان عدد الصفوف
+"""
+import csv
+import logging
+import tempfile
+from collections import namedtuple
+from decimal import Decimal
+from itertools import islice
+
+import xlsxwriter
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Frame, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus.doctemplate import LayoutError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .arabic_text import cache_stats, precompute_labels, reshape_arabic_text, shape_column
+from .archive import report_cars, report_expenses, report_sales, with_archive
+from .filters import parse_date_range
+from .font_manager import get_arabic_font_name, get_arabic_font_bold
+from .models import CAR_TYPE_LABELS, CLEARANCE_LABELS, STATUS_LABELS, ArchivedCar, Car
+
+logger = logging.getLogger(__name__)
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+PDF_CONTENT_TYPE = 'application/pdf'
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+NDJSON_CONTENT_TYPE = 'application/x-ndjson; charset=utf-8'
+
+# حجم الدفعة عند قراءة الصفوف من قاعدة البيانات
+ITERATOR_CHUNK_SIZE = 2000
+
+SALES_HEADERS = [
+    'اسم السيارة',
+    'النوع',
+    'السنة',
+    'الشاصي',
+    'تاريخ الشراء',
+    'قيمة الشراء',
+    'التخليص',
+]
+SALES_COLUMN_WIDTHS = [20, 15, 10, 15, 15, 15, 15]
+
+CARS_PDF_HEADERS = [
+    'الاسم',
+    'النوع',
+    'السنة',
+    'الشاصي',
+    'تاريخ الشراء',
+    'القيمة',
+    'التخليص',
+    'الحالة',
+]
+CARS_PDF_COLUMN_WIDTHS = [1.2*inch, 1.2*inch, 0.7*inch, 0.9*inch, 1*inch, 0.8*inch, 0.7*inch, 0.7*inch]
+
+SALES_PDF_HEADERS = [
+    'اسم السيارة',
+    'النوع',
+    'السنة',
+    'الشاصي',
+    'تاريخ الشراء',
+    'قيمة الشراء',
+    'التخليص',
+]
+SALES_PDF_COLUMN_WIDTHS = [1.2*inch, 1*inch, 0.7*inch, 0.9*inch, 1*inch, 0.8*inch, 0.9*inch]
+
+REPORT_CARS_HEADERS = ['الاسم', 'النوع', 'السنة', 'الشاصي', 'تاريخ الشراء', 'قيمة الشراء', 'التخليص', 'الحالة']
+REPORT_SALES_HEADERS = ['اسم السيارة', 'النوع', 'الشاصي', 'تاريخ البيع', 'قيمة البيع', 'قيمة الشراء', 'الربح الكلي',
+                        'الربح الجزئي']
+REPORT_EXPENSES_HEADERS = ['الوصف', 'القيمة', 'التاريخ']
+
+# معاملات التصفية التي يعتمد عليها ناتج التصدير
+# archive=1 يضم الأرشيف إلى التقرير
+EXPORT_FILTER_PARAMS = ('search', 'status', 'clearance', 'month', 'year', 'start_date', 'end_date', 'profit', 'sort',
+                        'archive')
+
+CARS_PDF_TITLE = 'قائمة السيارات'
+SALES_PDF_TITLE = 'قائمة المبيعات'
+
+# نصوص الحالة والتخليص كما تظهر في PDF السيارات
+CARS_PDF_STATUS = {'sold': 'مباع'}
+CARS_PDF_STATUS_DEFAULT = 'متاح'
+CARS_PDF_CLEARANCE = {'purchase': 'شراء'}
+CARS_PDF_CLEARANCE_DEFAULT = 'اعلان'
+
+precompute_labels(
+    CARS_PDF_HEADERS,
+    SALES_PDF_HEADERS,
+    [CARS_PDF_TITLE, SALES_PDF_TITLE, 'N/A'],
+    [*CARS_PDF_STATUS.values(), CARS_PDF_STATUS_DEFAULT],
+    [*CARS_PDF_CLEARANCE.values(), CARS_PDF_CLEARANCE_DEFAULT],
+)
+
+
+def export_params(query):
+    """Pick the filter parameters an export depends on from ``request.GET``."""
+    return {key: query[key] for key in EXPORT_FILTER_PARAMS if query.get(key)}
+
+
+def _blocks(rows, size=ITERATOR_CHUNK_SIZE):
+    """Group an iterator into lists of at most ``size`` items."""
+    rows = iter(rows)
+    while True:
+        block = list(islice(rows, size))
+        if not block:
+            return
+        yield block
+
+
+def sales_export_rows(sales):
+    """Yield one tuple per sale with the car columns used by the exports.
+
+    The car is joined in the same query and rows are read with
+    ``iterator()`` so neither model instances nor the full result set are
+    kept in memory.
+    """
+    rows = sales.values_list(
+        'car__name',
+        'car__car_type',
+        'car__year',
+        'car__chassis_number',
+        'car__purchase_date',
+        'car__purchase_value',
+        'car__clearance_type',
+    )
+    for name, car_type, year, chassis, purchase_date, purchase_value, clearance in rows.iterator(
+            chunk_size=ITERATOR_CHUNK_SIZE):
+        yield (
+            name or 'N/A',
+            CAR_TYPE_LABELS.get(car_type, car_type),
+            str(year),
+            chassis,
+            purchase_date.strftime('%d/%m/%Y'),
+            f'{purchase_value:.2f}',
+            CLEARANCE_LABELS.get(clearance, clearance),
+        )
+
+
+def cars_pdf_rows(cars):
+    """Yield the shaped PDF cells for every car in ``cars``.
+
+    Rows are processed in blocks so the free-text name column is shaped with
+    one ``shape_column`` call per block; the choice labels come from the
+    precomputed label table.
+    """
+    rows = cars.values_list(
+        'name',
+        'car_type',
+        'year',
+        'chassis_number',
+        'purchase_date',
+        'purchase_value',
+        'clearance_type',
+        'status',
+    )
+    for block in _blocks(rows.iterator(chunk_size=ITERATOR_CHUNK_SIZE)):
+        names = shape_column([row[0] or 'N/A' for row in block])
+        for shaped_name, (_, car_type, year, chassis, purchase_date, purchase_value, clearance, status) in zip(
+                names, block):
+            yield [
+                shaped_name,
+                reshape_arabic_text(CAR_TYPE_LABELS.get(car_type, car_type)),
+                str(year),
+                chassis,
+                purchase_date.strftime('%d/%m/%Y'),
+                f'{purchase_value:.2f}',
+                reshape_arabic_text(CARS_PDF_CLEARANCE.get(clearance, CARS_PDF_CLEARANCE_DEFAULT)),
+                reshape_arabic_text(CARS_PDF_STATUS.get(status, CARS_PDF_STATUS_DEFAULT)),
+            ]
+
+
+def sales_pdf_rows(sales):
+    """Yield the shaped PDF cells for every sale in ``sales``."""
+    for block in _blocks(sales_export_rows(sales)):
+        names = shape_column([row[0] for row in block])
+        for shaped_name, (_, car_type, year, chassis, purchase_date, purchase_value, clearance) in zip(
+                names, block):
+            yield [
+                shaped_name,
+                reshape_arabic_text(car_type),
+                year,
+                chassis,
+                purchase_date,
+                purchase_value,
+                reshape_arabic_text(clearance),
+            ]
+
+
+def _sheet_formats(workbook):
+    """إنشاء تنسيقات الخلايا مرة واحدة لكل ملف بدلاً من كل خلية"""
+    border = {'border': 1, 'border_color': '#bdc3c7'}
+    alignment = {'align': 'center', 'valign': 'vcenter', 'text_wrap': True}
+    body = {'font_name': 'Arial', 'font_size': 10, **alignment, **border}
+    alt = {'bg_color': '#f9f9f9', 'pattern': 1}
+    # تنسيقات الأعمدة الرقمية والتاريخية في التقرير الشامل
+    num_formats = {'text': {}, 'number': {'num_format': '#,##0.00'}, 'date': {'num_format': 'dd/mm/yyyy'}}
+
+    formats = {
+        'header': workbook.add_format({
+            'bold': True,
+            'font_name': 'Arial',
+            'font_size': 11,
+            'font_color': '#FFFFFF',
+            'bg_color': '#2c3e50',
+            'pattern': 1,
+            **alignment,
+            **border,
+        }),
+    }
+    for kind, num_format in num_formats.items():
+        formats[kind, False] = workbook.add_format({**body, **num_format})
+        formats[kind, True] = workbook.add_format({**body, **alt, **num_format})
+    return formats
+
+
+def write_table_sheet(workbook, formats, title, headers, column_widths, rows, column_types=None):
+    """Write ``rows`` to a new worksheet using the sales export layout.
+
+    ``column_types`` optionally marks columns as ``'number'`` or ``'date'``
+    so typed values get a matching cell format. Returns the number of data
+    rows written.
+    """
+    worksheet = workbook.add_worksheet(title)
+
+    for col, width in enumerate(column_widths):
+        worksheet.set_column(col, col, width)
+    worksheet.freeze_panes(1, 0)
+    worksheet.write_row(0, 0, headers, formats['header'])
+
+    count = 0
+    for count, row in enumerate(rows, 1):
+        # الصفوف الزوجية في الورقة (2، 4، ...) لها خلفية رمادية فاتحة
+        alt = (count + 1) % 2 == 0
+        if column_types is None:
+            worksheet.write_row(count, 0, row, formats['text', alt])
+        else:
+            for col, (value, kind) in enumerate(zip(row, column_types)):
+                worksheet.write(count, col, value, formats[kind, alt])
+    return count
+
+
+def write_sales_excel(sales, output):
+    """Write the sales workbook for ``sales`` to ``output`` (path or binary file)."""
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    try:
+        write_table_sheet(workbook, _sheet_formats(workbook), 'المبيعات', SALES_HEADERS, SALES_COLUMN_WIDTHS,
+                          sales_export_rows(sales))
+    finally:
+        workbook.close()
+
+
+def _full_report_cars(cars, user, date_range):
+    cars = cars.filter(user=user)
+    if date_range:
+        cars = cars.filter(purchase_date__range=date_range)
+    return cars
+
+
+def full_report_querysets(user, params):
+    """Cars, sales and expenses of ``user`` for the full report, limited by an optional date range."""
+    date_range = parse_date_range(params)
+    return {
+        'cars': with_archive(params, _full_report_cars(Car.objects.all(), user, date_range),
+                             _full_report_cars(ArchivedCar.objects.all(), user, date_range)),
+        'sales': report_sales(user, params),
+        'expenses': report_expenses(user, params),
+    }
+
+
+def _report_cars_rows(cars, totals):
+    rows = cars.values_list(
+        'name',
+        'car_type',
+        'year',
+        'chassis_number',
+        'purchase_date',
+        'purchase_value',
+        'clearance_type',
+        'status',
+    )
+    for name, car_type, year, chassis, purchase_date, purchase_value, clearance, status in rows.iterator(
+            chunk_size=ITERATOR_CHUNK_SIZE):
+        totals['cars'] += 1
+        totals['purchase_value'] += purchase_value
+        if status == 'sold':
+            totals['sold_cars'] += 1
+        yield (
+            name or 'N/A',
+            CAR_TYPE_LABELS.get(car_type, car_type),
+            year,
+            chassis,
+            purchase_date,
+            purchase_value,
+            CLEARANCE_LABELS.get(clearance, clearance),
+            STATUS_LABELS.get(status, status),
+        )
+
+
+def _report_sales_rows(sales, totals):
+    rows = sales.values_list(
+        'car__name',
+        'car__car_type',
+        'car__chassis_number',
+        'sale_date',
+        'sale_value',
+        'car__purchase_value',
+        'total_profit',
+        'partial_profit',
+    )
+    for name, car_type, chassis, sale_date, sale_value, purchase_value, total_profit, partial_profit in rows.iterator(
+            chunk_size=ITERATOR_CHUNK_SIZE):
+        totals['sales'] += 1
+        totals['revenue'] += sale_value
+        totals['cost_of_sales'] += purchase_value
+        totals['total_profit'] += total_profit
+        totals['partial_profit'] += partial_profit
+        yield (
+            name or 'N/A',
+            CAR_TYPE_LABELS.get(car_type, car_type),
+            chassis,
+            sale_date,
+            sale_value,
+            purchase_value,
+            total_profit,
+            partial_profit,
+        )
+
+
+def _report_expenses_rows(expenses, totals):
+    rows = expenses.values_list('description', 'amount', 'date')
+    for description, amount, date in rows.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        totals['expenses_count'] += 1
+        totals['expenses'] += amount
+        yield description, amount, date
+
+
+def write_full_report(querysets, output):
+    """Write the cars, sales, expenses and summary sheets in a single pass.
+
+    Each sheet is fed by one query and the summary totals are accumulated
+    while those rows stream through, so no extra aggregate queries run.
+    """
+    totals = {
+        'cars': 0,
+        'sold_cars': 0,
+        'purchase_value': Decimal('0.00'),
+        'sales': 0,
+        'revenue': Decimal('0.00'),
+        'cost_of_sales': Decimal('0.00'),
+        'total_profit': Decimal('0.00'),
+        'partial_profit': Decimal('0.00'),
+        'expenses_count': 0,
+        'expenses': Decimal('0.00'),
+    }
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    try:
+        formats = _sheet_formats(workbook)
+        write_table_sheet(
+            workbook, formats, 'السيارات', REPORT_CARS_HEADERS, [20, 15, 10, 18, 15, 15, 12, 12],
+            _report_cars_rows(querysets['cars'], totals),
+            ['text', 'text', 'text', 'text', 'date', 'number', 'text', 'text'],
+        )
+        write_table_sheet(
+            workbook, formats, 'المبيعات', REPORT_SALES_HEADERS, [20, 15, 18, 15, 15, 15, 15, 15],
+            _report_sales_rows(querysets['sales'], totals),
+            ['text', 'text', 'text', 'date', 'number', 'number', 'number', 'number'],
+        )
+        write_table_sheet(
+            workbook, formats, 'المصروفات', REPORT_EXPENSES_HEADERS, [40, 15, 15],
+            _report_expenses_rows(querysets['expenses'], totals),
+            ['text', 'number', 'date'],
+        )
+        summary = [
+            ('إجمالي السيارات', totals['cars']),
+            ('السيارات المباعة', totals['sold_cars']),
+            ('السيارات المتاحة', totals['cars'] - totals['sold_cars']),
+            ('مجموع قيم الشراء', totals['purchase_value']),
+            ('عدد المبيعات', totals['sales']),
+            ('مجموع قيم البيع', totals['revenue']),
+            ('تكلفة السيارات المباعة', totals['cost_of_sales']),
+            ('مجموع الربح الكلي', totals['total_profit']),
+            ('مجموع الأرباح الجزئية', totals['partial_profit']),
+            ('عدد المصروفات', totals['expenses_count']),
+            ('مجموع المصروفات', totals['expenses']),
+            ('صافي الأرباح', totals['partial_profit'] - totals['expenses']),
+        ]
+        write_table_sheet(workbook, formats, 'الملخص', ['البند', 'القيمة'], [30, 20], summary,
+                          ['text', 'number'])
+    finally:
+        workbook.close()
+    return totals
+
+
+class TablePDF:
+    """Paged renderer for a titled table laid out like the old SimpleDocTemplate export.
+
+    Rows are pulled from an iterator one page at a time. Each page gets its
+    own small ``Table`` with the header row repeated. Column widths are
+    fixed and the number of rows per page is measured once up front, so
+    reportlab never has to measure or split a table holding every row.
+    Pages are drawn straight onto the canvas as they are filled.
+    """
+
+    page_size = A4
+    left_margin = right_margin = inch
+    top_margin = bottom_margin = 0.75*inch
+    frame_padding = 6
+
+    def __init__(self, title, headers, col_widths):
+        self.title_font = get_arabic_font_bold()
+        self.body_font = get_arabic_font_name()
+        self.title = reshape_arabic_text(title)
+        self.headers = [reshape_arabic_text(header) for header in headers]
+        self.col_widths = col_widths
+        self.title_style = ParagraphStyle(
+            'Title',
+            parent=getSampleStyleSheet()['Heading1'],
+            alignment=TA_CENTER,
+            fontSize=16,
+            textColor=colors.HexColor('#2c3e50'),
+            fontName=self.title_font,
+            spaceAfter=20,
+        )
+        page_width, page_height = self.page_size
+        self.frame_args = (
+            self.left_margin,
+            self.bottom_margin,
+            page_width - self.left_margin - self.right_margin,
+            page_height - self.top_margin - self.bottom_margin,
+        )
+
+    def title_flowables(self):
+        return [Paragraph(self.title, self.title_style), Spacer(1, 0.3*inch)]
+
+    def table_style(self, row_offset=0):
+        # نحافظ على تناوب ألوان الصفوف بين الصفحات
+        row_colors = [colors.white, colors.HexColor('#f9f9f9')]
+        if row_offset % 2:
+            row_colors.reverse()
+        return TableStyle([
+            # Header styling
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTNAME', (0, 0), (-1, 0), self.title_font),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('TOPPADDING', (0, 0), (-1, 0), 8),
+
+            # Body styling
+            ('FONTNAME', (0, 1), (-1, -1), self.body_font),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), row_colors),
+            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#bdc3c7')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 5),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+            ('TOPPADDING', (0, 1), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
+        ])
+
+    def make_table(self, rows, row_offset=0):
+        table = Table([self.headers] + rows, colWidths=self.col_widths, repeatRows=1)
+        table.setStyle(self.table_style(row_offset))
+        return table
+
+    def page_capacity(self, sample_row):
+        """Return ``(first_page_rows, page_rows)`` for rows shaped like ``sample_row``."""
+        _, _, frame_width, frame_height = self.frame_args
+        avail_width = frame_width - 2*self.frame_padding
+        avail_height = frame_height - 2*self.frame_padding
+
+        probe = self.make_table([sample_row])
+        probe.wrap(avail_width, avail_height)
+        header_height, row_height = probe._rowHeights[0], probe._rowHeights[1]
+
+        title_height = 0
+        for flowable in self.title_flowables():
+            _, height = flowable.wrap(avail_width, avail_height)
+            title_height += height + flowable.getSpaceAfter()
+
+        # هامش صغير لتفادي أخطاء التقريب عند الحافة السفلية
+        table_height = avail_height - header_height - 1e-3
+        first_page_rows = max(int((table_height - title_height) // row_height), 1)
+        page_rows = max(int(table_height // row_height), 1)
+        return first_page_rows, page_rows
+
+    def _draw_pages(self, pdf, flowables):
+        """Draw ``flowables`` on as many pages as they need (normally one)."""
+        while flowables:
+            frame = Frame(*self.frame_args)
+            remaining = len(flowables)
+            frame.addFromList(flowables, pdf)
+            if flowables:
+                # صف أطول من المتوقع: نقسم الجدول ونكمل في صفحة جديدة
+                parts = frame.split(flowables[0], pdf)
+                if parts:
+                    flowables[0:1] = parts
+                    frame.addFromList(flowables, pdf)
+                elif len(flowables) == remaining and frame._atTop:
+                    raise LayoutError('Flowable %r does not fit on an empty page' % flowables[0])
+            pdf.showPage()
+
+    def render(self, rows, output, first_page=True, row_offset=0):
+        """Render ``rows`` into ``output``.
+
+        ``first_page`` controls whether the title is drawn at the top of the
+        first page; ``row_offset`` is the index of the first row in the full
+        table so the alternating row colours line up.
+        """
+        pdf = canvas.Canvas(output, pagesize=self.page_size)
+        rows = iter(rows)
+        first = list(islice(rows, 1))
+        if first:
+            first_page_rows, page_rows = self.page_capacity(first[0])
+        else:
+            first_page_rows = page_rows = 0
+
+        chunk = first + list(islice(rows, (first_page_rows if first_page else page_rows) - len(first)))
+        prefix = self.title_flowables() if first_page else []
+        while True:
+            self._draw_pages(pdf, prefix + [self.make_table(chunk, row_offset)])
+            row_offset += len(chunk)
+            chunk = list(islice(rows, page_rows))
+            if not chunk:
+                break
+            prefix = []
+        pdf.save()
+
+
+def render_cars_pdf(cars, output):
+    TablePDF(CARS_PDF_TITLE, CARS_PDF_HEADERS, CARS_PDF_COLUMN_WIDTHS).render(cars_pdf_rows(cars), output)
+    logger.debug('Arabic shaping cache after cars PDF: %s', cache_stats())
+
+
+def render_sales_pdf(sales, output):
+    TablePDF(SALES_PDF_TITLE, SALES_PDF_HEADERS, SALES_PDF_COLUMN_WIDTHS).render(sales_pdf_rows(sales), output)
+    logger.debug('Arabic shaping cache after sales PDF: %s', cache_stats())
+
+
+ExportKind = namedtuple('ExportKind', 'queryset writer filename content_type label')
+
+EXPORT_KINDS = {
+    'cars_pdf': ExportKind(report_cars, render_cars_pdf, 'cars_list.pdf', PDF_CONTENT_TYPE, 'PDF'),
+    'sales_pdf': ExportKind(report_sales, render_sales_pdf, 'sales_list.pdf', PDF_CONTENT_TYPE, 'PDF'),
+    'sales_excel': ExportKind(report_sales, write_sales_excel, 'sales_list.xlsx', XLSX_CONTENT_TYPE,
+                              'Excel'),
+    'full_report': ExportKind(full_report_querysets, write_full_report, 'full_report.xlsx', XLSX_CONTENT_TYPE,
+                              'Excel'),
+}
+
+
+def write_export(kind, user, params, output):
+    """Render export ``kind`` for ``user`` and filter ``params`` into ``output``."""
+    export = EXPORT_KINDS[kind]
+    export.writer(export.queryset(user, params), output)
+
+
+# الصفوف الخام لتكامل المحاسبة: (اسم العمود، الحقل في قاعدة البيانات)
+RawExport = namedtuple('RawExport', 'queryset columns filename')
+
+RAW_EXPORTS = {
+    'cars': RawExport(report_cars, [
+        ('id', 'id'),
+        ('name', 'name'),
+        ('car_type', 'car_type'),
+        ('year', 'year'),
+        ('chassis_number', 'chassis_number'),
+        ('purchase_date', 'purchase_date'),
+        ('purchase_value', 'purchase_value'),
+        ('clearance_type', 'clearance_type'),
+        ('status', 'status'),
+    ], 'cars'),
+    'sales': RawExport(report_sales, [
+        ('id', 'id'),
+        ('car_id', 'car_id'),
+        ('chassis_number', 'car__chassis_number'),
+        ('sale_date', 'sale_date'),
+        ('sale_value', 'sale_value'),
+        ('purchase_value', 'car__purchase_value'),
+        ('total_profit', 'total_profit'),
+        ('partial_profit', 'partial_profit'),
+    ], 'sales'),
+    'expenses': RawExport(report_expenses, [
+        ('id', 'id'),
+        ('description', 'description'),
+        ('amount', 'amount'),
+        ('date', 'date'),
+    ], 'expenses'),
+}
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the text, for ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+def raw_export_rows(name, user, params):
+    """Yield value tuples for raw export ``name`` straight from ``values_list().iterator()``."""
+    export = RAW_EXPORTS[name]
+    rows = export.queryset(user, params).values_list(*[field for _, field in export.columns])
+    return rows.iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+
+
+def csv_lines(name, user, params):
+    """Stream raw export ``name`` as CSV text, one block of rows per chunk."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([column for column, _ in RAW_EXPORTS[name].columns])
+    for block in _blocks(raw_export_rows(name, user, params)):
+        yield ''.join(writer.writerow(row) for row in block)
+
+
+def ndjson_lines(name, user, params):
+    """Stream raw export ``name`` as newline-delimited JSON objects."""
+    columns = [column for column, _ in RAW_EXPORTS[name].columns]
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for block in _blocks(raw_export_rows(name, user, params)):
+        yield ''.join(encoder.encode(dict(zip(columns, row))) + '\n' for row in block)
+
+
+def spooled_export(writer, *args):
+    """Run ``writer(*args, fileobj)`` into a temporary file and rewind it.
+
+    Neither the xlsx container nor the PDF cross-reference table can be
+    finished before the last row is written, so the bytes are spooled to
+    disk instead of memory and then streamed to the client in blocks by
+    ``FileResponse``.
+    """
+    output = tempfile.TemporaryFile()
+    try:
+        writer(*args, output)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return output
@@ -0,0 +1,124 @@
+"""
+طبقة التصفية المشتركة - نفس تصفية السيارات والمبيعات والمصروفات في الصفحات والتصدير والواجهات البرمجية.
+تصفية الشهر/السنة تُحوّل إلى نطاق تاريخ حتى تستفيد من الفهارس المركبة.
+"""
+from datetime import date, datetime
+
+from django.db.models import Exists, OuterRef
+
+from .models import Car, MonthlyExpense, Sale
+from .search import search_cars
+
+
+def _int_or_none(value, low, high):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if low <= value <= high else None
+
+
+def month_year_range(month=None, year=None):
+    """Half-open ``(start, end)`` dates covering ``month``/``year``, or None.
+
+    A year alone covers the whole year. A month without a year has no
+    single date range, so None is returned and the caller falls back to a
+    ``__month`` lookup.
+    """
+    if year is None:
+        return None
+    if month is None:
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    if month == 12:
+        return date(year, 12, 1), date(year + 1, 1, 1)
+    return date(year, month, 1), date(year, month + 1, 1)
+
+
+def parse_date_range(params):
+    """``(start, end)`` dates from ``start_date``/``end_date`` (YYYY-MM-DD), or None."""
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    if start_date and end_date:
+        try:
+            return (datetime.strptime(start_date, '%Y-%m-%d').date(),
+                    datetime.strptime(end_date, '%Y-%m-%d').date())
+        except ValueError:
+            # ignore invalid date formats
+            pass
+    return None
+
+
+def car_filters(params):
+    """Cleaned car filter values; invalid month/year values become None."""
+    return {
+        'search': (params.get('search') or '').strip(),
+        'status': params.get('status') or '',
+        'clearance': params.get('clearance') or '',
+        'month': _int_or_none(params.get('month'), 1, 12),
+        'year': _int_or_none(params.get('year'), 1, 9998),
+    }
+
+
+def filter_cars(user, params, queryset=None):
+    """Cars of ``user`` filtered by search, status, clearance and purchase month/year."""
+    cars = queryset if queryset is not None else Car.objects.all()
+    cars = cars.filter(user=user)
+    values = car_filters(params)
+
+    if values['search']:
+        cars = search_cars(cars, user, values['search'])
+    if values['status']:
+        cars = cars.filter(status=values['status'])
+    if values['clearance']:
+        cars = cars.filter(clearance_type=values['clearance'])
+
+    date_range = month_year_range(values['month'], values['year'])
+    if date_range:
+        cars = cars.filter(purchase_date__gte=date_range[0], purchase_date__lt=date_range[1])
+    elif values['month']:
+        cars = cars.filter(purchase_date__month=values['month'])
+    return cars
+
+
+# ترتيب المبيعات المسموح به من الطلب: ?sort=profit أو ?sort=-profit
+SALE_SORTS = {
+    'profit': ('total_profit',),
+    '-profit': ('-total_profit',),
+}
+
+
+def owned_sales(sales, user):
+    """``sales`` limited to cars owned by ``user`` through an EXISTS subquery instead of a join."""
+    # بالربط على السيارات يبدأ SQLite من كل سيارات المستخدم ثم يرتب؛ شرط الملكية كـ EXISTS
+    # يجعله يبدأ من فهرس الجدول المُصفّى (sale_date أو updated_at) فيقرأ الصفوف المطلوبة فقط
+    cars = sales.model._meta.get_field('car').related_model.objects.filter(pk=OuterRef('car_id'), user=user)
+    return sales.filter(Exists(cars))
+
+
+def filter_sales(user, params, queryset=None):
+    """Sales of ``user``, optionally limited to a sale date range, gains/losses and sorted by profit."""
+    sales = queryset if queryset is not None else Sale.objects.all()
+    date_range = parse_date_range(params)
+    if date_range:
+        sales = owned_sales(sales, user).filter(sale_date__range=date_range)
+    else:
+        sales = sales.filter(car__user=user)
+    profit = params.get('profit')
+    if profit == 'loss':
+        sales = sales.losses()
+    elif profit == 'gain':
+        sales = sales.gains()
+    sort = SALE_SORTS.get(params.get('sort'))
+    if sort:
+        sales = sales.order_by(*sort)
+    return sales
+
+
+def filter_expenses(user, params, queryset=None):
+    """Expenses of ``user``, optionally limited to a date range."""
+    expenses = queryset if queryset is not None else MonthlyExpense.objects.all()
+    expenses = expenses.filter(user=user)
+    date_range = parse_date_range(params)
+    if date_range:
+        expenses = expenses.filter(date__range=date_range)
+    return expenses
@@ -1,91 +1,89 @@
 """
-مدير الخطوط العربية - يدعم تحميل الخطوط على جميع الأنظمة
+مدير الخطوط العربية - يسجل الخط المرفق مع المشروع عند أول تصدير PDF فقط
 """
-import os
+import logging
+import threading
 from pathlib import Path
+
+from django.conf import settings
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
+logger = logging.getLogger(__name__)
+
 FONTS_DIR = Path(__file__).parent.parent / 'static' / 'fonts'
 
-def get_system_font_path():
-    """الحصول على مسار خط عربي من النظام"""
-    # مسارات محتملة للخطوط العربية على أنظمة مختلفة
-    # نبحث عن خطوط تدعم العربية: DejaVuSans, Noto, Liberation
-    possible_paths = [
-        # Linux - خطوط عربية
-        '/usr/share/fonts/truetype/noto/NotoSansArabic-Regular.ttf',
-        '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
-        '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
-        # Windows - خطوط عربية
-        'C:\\Windows\\Fonts\\arial.ttf',  # Arial يدعم العربية على Windows
-        'C:\\Windows\\Fonts\\calibri.ttf',
-        'C:\\Windows\\Fonts\\times.ttf',
-        'C:\\Windows\\Fonts\\DejaVuSans.ttf',
-    ]
-    
-    for path in possible_paths:
+# خط DejaVu Sans يغطي الحروف العربية وأشكالها الموصولة، ويُرفق مع المشروع
+BUNDLED_FONT = FONTS_DIR / 'DejaVuSans.ttf'
+
+ARABIC_FONT_NAME = 'ArabicFont'
+
+# مسارات احتياطية على النظام إذا حُذف الخط المرفق
+SYSTEM_FONT_PATHS = [
+    # Linux - خطوط عربية
+    '/usr/share/fonts/truetype/noto/NotoSansArabic-Regular.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    # Windows - خطوط عربية
+    'C:\\Windows\\Fonts\\arial.ttf',  # Arial يدعم العربية على Windows
+    'C:\\Windows\\Fonts\\DejaVuSans.ttf',
+]
+
+_lock = threading.Lock()
+_registered_font = None
+
+
+def get_font_path():
+    """الحصول على مسار الخط العربي: إعداد ARABIC_FONT_PATH، ثم الخط المرفق، ثم خطوط النظام"""
+    configured = getattr(settings, 'ARABIC_FONT_PATH', None)
+    candidates = [configured] if configured else []
+    candidates += [BUNDLED_FONT, *SYSTEM_FONT_PATHS]
+    for path in candidates:
         if Path(path).exists():
-            print(f"✓ وجدت الخط: {path}")
-            return path
+            return str(path)
     return None
 
+
 def register_arabic_fonts():
-    """تسجيل خطوط عربية للاستخدام في PDF"""
-    try:
-        # محاولة 1: البحث عن خط عربي على النظام
-        system_font = get_system_font_path()
-        if system_font:
-            try:
-                pdfmetrics.registerFont(TTFont('ArabicFont', system_font))
-                pdfmetrics.registerFont(TTFont('ArabicFontBold', system_font))
-                print(f"✓ تم تسجيل الخط: {system_font}")
-                return True
-            except Exception as e:
-                print(f"تحذير: لم يتمكن من تسجيل {system_font}: {e}")
-        
-        # محاولة 2: استخدام Courier كبديل افتراضي (يدعم Unicode)
+    """Register the Arabic font with reportlab once per process.
+
+    The TrueType file is parsed on the first call only; later calls return
+    the cached result. reportlab embeds only the glyphs a document uses, so
+    a single registered face serves both the regular and the bold text.
+    Returns True when an Arabic font is available.
+    """
+    global _registered_font
+    if _registered_font is not None:
+        return bool(_registered_font)
+
+    with _lock:
+        if _registered_font is not None:
+            return bool(_registered_font)
+        path = get_font_path()
+        if path is None:
+            logger.warning('لم يتم العثور على خط عربي، سيتم استخدام Helvetica')
+            _registered_font = ''
+            return False
         try:
-            pdfmetrics.registerFont(TTFont('ArabicFont', 'Courier'))
-            pdfmetrics.registerFont(TTFont('ArabicFontBold', 'Courier-Bold'))
-            print("✓ تم تسجيل Courier كخط عربي بديل")
-        except:
-            print("تحذير: لم يتمكن من تسجيل أي خط عربي، سيتم استخدام الخطوط الافتراضية")
-            
-        return False
-        
-    except Exception as e:
-        print(f"خطأ في تسجيل الخطوط: {e}")
-        return False
+            pdfmetrics.registerFont(TTFont(ARABIC_FONT_NAME, path))
+        except Exception as e:
+            logger.warning('لم يتمكن من تسجيل الخط %s: %s', path, e)
+            _registered_font = ''
+            return False
+        logger.info('تم تسجيل الخط العربي: %s', path)
+        _registered_font = ARABIC_FONT_NAME
+        return True
+
 
 def get_arabic_font_name():
     """الحصول على اسم الخط العربي المسجل"""
-    try:
-        # تحقق من ما إذا كان الخط موجود
-        available_fonts = pdfmetrics.tt2ps._fonts if hasattr(pdfmetrics.tt2ps, '_fonts') else {}
-        
-        if 'ArabicFont' in available_fonts:
-            return 'ArabicFont'
-        if 'ArabicFontBold' in available_fonts:
-            return 'ArabicFontBold'
-        if 'Courier' in available_fonts:
-            return 'Courier'
-    except:
-        pass
-    
+    if register_arabic_fonts():
+        return ARABIC_FONT_NAME
     # إذا لم يوجد، استخدم Helvetica كبديل
     return 'Helvetica'
 
+
 def get_arabic_font_bold():
-    """الحصول على اسم الخط العربي الغامق"""
-    try:
-        available_fonts = pdfmetrics.tt2ps._fonts if hasattr(pdfmetrics.tt2ps, '_fonts') else {}
-        
-        if 'ArabicFontBold' in available_fonts:
-            return 'ArabicFontBold'
-        if 'Courier-Bold' in available_fonts:
-            return 'Courier-Bold'
-    except:
-        pass
+    """الحصول على اسم الخط العربي للعناوين (نفس الخط المسجل كما في السابق)"""
+    if register_arabic_fonts():
+        return ARABIC_FONT_NAME
     return 'Helvetica-Bold'
-
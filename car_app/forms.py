@@ -1,5 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
+from django.core.validators import FileExtensionValidator
+from .imports import IMPORT_EXTENSIONS
 from .models import Car, Sale, MonthlyExpense
 
 
@@ -54,3 +56,16 @@ class MonthlyExpenseForm(forms.ModelForm):
             'amount': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
             'date': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
         }
+
+
+class ImportForm(forms.Form):
+    KIND_CHOICES = [
+        ('cars', 'سيارات'),
+        ('expenses', 'مصروفات'),
+    ]
+
+    kind = forms.ChoiceField(choices=KIND_CHOICES, widget=forms.Select(attrs={'class': 'form-control'}))
+    file = forms.FileField(
+        validators=[FileExtensionValidator([extension.lstrip('.') for extension in IMPORT_EXTENSIONS])],
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': ','.join(IMPORT_EXTENSIONS)}),
+    )
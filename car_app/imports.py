@@ -0,0 +1,268 @@
+"""
+استيراد السيارات والمصروفات من ملفات CSV أو XLSX بكميات كبيرة - قراءة متدفقة للملف،
+تحقق من تكرار رقم الشاصي باستعلام واحد لكل دفعة، وإدخال بـ bulk_create في معاملة لكل دفعة
+"""
+import codecs
+import csv
+import os
+import zipfile
+from collections import namedtuple
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from .models import Car, DataVersion, MonthlyExpense
+from .rollups import refresh_months
+from .search import index_cars
+
+IMPORT_BATCH_SIZE = 2000
+
+# عدد الأخطاء المحفوظة بتفاصيلها في التقرير، وما بعدها يُعد فقط
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_EXTENSIONS = ('.csv', '.xlsx')
+
+RowError = namedtuple('RowError', 'line field message')
+
+ImportResult = namedtuple('ImportResult', 'created errors error_count')
+
+
+class ImportFileError(ValueError):
+    """The uploaded file cannot be read as CSV or XLSX."""
+
+
+# أسماء الأعمدة المقبولة: أسماء ملف التصدير CSV أو العناوين العربية
+CAR_COLUMNS = {
+    'name': 'name',
+    'اسم السيارة': 'name',
+    'car_type': 'car_type',
+    'النوع': 'car_type',
+    'year': 'year',
+    'السنة': 'year',
+    'chassis_number': 'chassis_number',
+    'رقم الشاصي': 'chassis_number',
+    'purchase_date': 'purchase_date',
+    'تاريخ الشراء': 'purchase_date',
+    'purchase_value': 'purchase_value',
+    'قيمة الشراء': 'purchase_value',
+    'clearance_type': 'clearance_type',
+    'نوع التخليص': 'clearance_type',
+    'status': 'status',
+    'الحالة': 'status',
+}
+
+EXPENSE_COLUMNS = {
+    'description': 'description',
+    'الوصف': 'description',
+    'amount': 'amount',
+    'القيمة': 'amount',
+    'date': 'date',
+    'التاريخ': 'date',
+}
+
+
+def _choice_codes(choices):
+    """Map both the stored code and the Arabic label of each choice to the code."""
+    codes = {}
+    for code, label in choices:
+        codes[code] = code
+        codes[label] = code
+    return codes
+
+
+CAR_TYPE_CODES = _choice_codes(Car.CAR_TYPE_CHOICES)
+CLEARANCE_CODES = _choice_codes(Car.CLEARANCE_CHOICES)
+STATUS_CODES = _choice_codes(Car.STATUS_CHOICES)
+
+
+def _csv_rows(upload):
+    reader = csv.reader(codecs.getreader('utf-8-sig')(upload))
+    try:
+        header = next(reader, None)
+        for line, values in enumerate(reader, start=2):
+            yield line, header, values
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFileError(f'تعذر قراءة ملف CSV: {exc}')
+
+
+def _xlsx_rows(upload):
+    try:
+        # read_only يقرأ الورقة صفاً صفاً بدل تحميلها كلها في الذاكرة
+        workbook = load_workbook(upload, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError) as exc:
+        raise ImportFileError(f'تعذر قراءة ملف Excel: {exc}')
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        for line, values in enumerate(rows, start=2):
+            yield line, header, values
+    finally:
+        workbook.close()
+
+
+def read_rows(upload, columns, name=None):
+    """Yield ``(line, values)`` for each non-empty row of a CSV or XLSX ``upload``.
+
+    ``values`` maps model field names to the raw cell values, using
+    ``columns`` to translate the header row. Unknown columns are ignored.
+    The format follows the extension of ``name`` (default: ``upload.name``).
+    """
+    extension = os.path.splitext(name or getattr(upload, 'name', ''))[1].lower()
+    if extension == '.csv':
+        rows = _csv_rows(upload)
+    elif extension == '.xlsx':
+        rows = _xlsx_rows(upload)
+    else:
+        raise ImportFileError('صيغة الملف غير مدعومة، استخدم CSV أو XLSX')
+
+    fields = None
+    for line, header, values in rows:
+        if fields is None:
+            fields = [columns.get(str(title or '').strip().lower()) for title in header or ()]
+            if not any(fields):
+                raise ImportFileError('لم يُعثر على أعمدة معروفة في الصف الأول من الملف')
+        row = {}
+        for field, value in zip(fields, values):
+            if field is None:
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+            row[field] = value
+        if any(value not in (None, '') for value in row.values()):
+            yield line, row
+
+
+def _validation_errors(line, exc):
+    return [RowError(line, field, message)
+            for field, messages in exc.message_dict.items()
+            for message in messages]
+
+
+def _build(model, user, line, values):
+    """Validated unsaved ``model`` instance for one row, or a list of RowErrors."""
+    instance = model(user=user, **values)
+    try:
+        # التحقق من التفرد يتم لكل دفعة باستعلام واحد بدل استعلام لكل صف
+        instance.full_clean(exclude=['user'], validate_unique=False, validate_constraints=False)
+    except ValidationError as exc:
+        return _validation_errors(line, exc)
+    return instance
+
+
+def _car_from_row(user, line, values):
+    if values.get('status') in (None, ''):
+        # خلية الحالة الفارغة تعني القيمة الافتراضية (غير مباع)
+        values.pop('status', None)
+    for field, codes in (('car_type', CAR_TYPE_CODES), ('clearance_type', CLEARANCE_CODES), ('status', STATUS_CODES)):
+        if field in values:
+            values[field] = codes.get(values[field], values[field])
+    if values.get('name') is None:
+        values['name'] = ''
+    return _build(Car, user, line, values)
+
+
+def _expense_from_row(user, line, values):
+    return _build(MonthlyExpense, user, line, values)
+
+
+def _chassis_check():
+    """Batch check rejecting chassis numbers already in the database or earlier in the file."""
+    seen = set()
+
+    def check(batch):
+        numbers = [car.chassis_number for _, car in batch]
+        taken = set(Car.objects.filter(chassis_number__in=numbers).values_list('chassis_number', flat=True))
+        accepted, errors = [], []
+        for line, car in batch:
+            if car.chassis_number in taken:
+                errors.append(RowError(line, 'chassis_number', 'رقم الشاصي موجود بالفعل في النظام!'))
+            elif car.chassis_number in seen:
+                errors.append(RowError(line, 'chassis_number', 'رقم الشاصي مكرر في الملف'))
+            else:
+                seen.add(car.chassis_number)
+                accepted.append((line, car))
+        return accepted, errors
+
+    return check
+
+
+def _import(user, rows, model, build, date_field, check=None, batch_size=IMPORT_BATCH_SIZE):
+    """Validate and insert ``rows`` in batches; returns an ImportResult.
+
+    Each batch is validated row by row, checked as a whole by ``check``
+    (one query), then inserted with ``bulk_create`` in its own
+    transaction. Rows with errors are skipped and reported. Since
+    ``bulk_create`` sends no signals, the search index, monthly rollups
+    and data version are updated here.
+    """
+    created = 0
+    errors = []
+    error_count = 0
+    months = set()
+
+    def report(row_errors):
+        nonlocal error_count
+        error_count += len(row_errors)
+        errors.extend(row_errors[:max(MAX_REPORTED_ERRORS - len(errors), 0)])
+
+    rows = iter(rows)
+    try:
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            batch = []
+            for line, values in chunk:
+                result = build(user, line, values)
+                if isinstance(result, list):
+                    report(result)
+                else:
+                    batch.append((line, result))
+            if check and batch:
+                batch, batch_errors = check(batch)
+                report(batch_errors)
+            if not batch:
+                continue
+
+            objects = [instance for _, instance in batch]
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(objects, batch_size=batch_size)
+                    if model is Car:
+                        index_cars(objects)
+            except IntegrityError:
+                # رقم شاصي أُضيف من طلب آخر بعد التحقق - تُرفض الدفعة كلها
+                report([RowError(line, None, 'تعذر حفظ الصف، أعد استيراد الدفعة') for line, _ in batch])
+                continue
+            created += len(objects)
+            months.update(getattr(instance, date_field) for instance in objects)
+    finally:
+        if created:
+            refresh_months(user.pk, months)
+            DataVersion.bump(user.pk)
+    return ImportResult(created, sorted(errors, key=lambda error: error.line), error_count)
+
+
+def import_cars(user, rows, batch_size=IMPORT_BATCH_SIZE):
+    """Import car rows from ``read_rows(upload, CAR_COLUMNS)`` for ``user``."""
+    return _import(user, rows, Car, _car_from_row, 'purchase_date', _chassis_check(), batch_size)
+
+
+def import_expenses(user, rows, batch_size=IMPORT_BATCH_SIZE):
+    """Import expense rows from ``read_rows(upload, EXPENSE_COLUMNS)`` for ``user``."""
+    return _import(user, rows, MonthlyExpense, _expense_from_row, 'date', batch_size=batch_size)
+
+
+IMPORTERS = {
+    'cars': (CAR_COLUMNS, import_cars),
+    'expenses': (EXPENSE_COLUMNS, import_expenses),
+}
+
+
+def import_file(user, kind, upload, name=None, batch_size=IMPORT_BATCH_SIZE):
+    """Import a CSV/XLSX ``upload`` of ``kind`` ('cars' or 'expenses') for ``user``."""
+    columns, importer = IMPORTERS[kind]
+    return importer(user, read_rows(upload, columns, name), batch_size)
@@ -0,0 +1,105 @@
+"""
+طابور مهام التصدير - تنفيذ ملفات PDF و Excel الكبيرة في الخلفية
+"""
+import logging
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections
+from django.urls import reverse
+from django.utils import timezone
+
+from .export_cache import open_export
+from .exports import EXPORT_KINDS
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_export(user, kind, params):
+    """Create a pending job; a worker from ``run_export_worker`` will pick it up."""
+    return ExportJob.objects.create(user=user, kind=kind, params=params)
+
+
+def job_payload(job):
+    """JSON-serialisable description of ``job`` for the status endpoint."""
+    data = {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'status_url': reverse('export_job_status', args=[job.id]),
+        'download_url': None,
+    }
+    if job.status == 'done':
+        data['download_url'] = reverse('export_job_download', args=[job.id])
+    if job.status == 'failed':
+        data['error'] = job.error
+    return data
+
+
+def requeue_stale_jobs():
+    """Put jobs left ``running`` by a crashed worker back in the queue."""
+    stale_after = timedelta(seconds=getattr(settings, 'EXPORT_JOB_STALE_AFTER', 1800))
+    return ExportJob.objects.filter(
+        status='running',
+        started_at__lt=timezone.now() - stale_after,
+    ).update(status='pending', started_at=None)
+
+
+def claim_next_job():
+    """Atomically move the oldest pending job to ``running`` and return it.
+
+    The conditional UPDATE only succeeds for one worker, so several
+    processes can poll the same table without an external broker.
+    """
+    while True:
+        job_id = (ExportJob.objects.filter(status='pending')
+                  .order_by('created_at', 'id')
+                  .values_list('id', flat=True)
+                  .first())
+        if job_id is None:
+            return None
+        claimed = ExportJob.objects.filter(id=job_id, status='pending').update(
+            status='running',
+            started_at=timezone.now(),
+        )
+        if claimed:
+            return ExportJob.objects.select_related('user').get(id=job_id)
+
+
+def run_job(job):
+    """Render ``job`` into MEDIA_ROOT and record the outcome."""
+    export = EXPORT_KINDS[job.kind]
+    try:
+        output = open_export(job.kind, job.user, job.params)
+        with output:
+            _, ext = os.path.splitext(export.filename)
+            job.file.save(f'{job.user_id}/{job.kind}_{job.id}{ext}', File(output), save=False)
+    except Exception as e:
+        logger.exception('Export job %s failed', job.id)
+        job.status = 'failed'
+        job.error = str(e)
+    else:
+        job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'file', 'error', 'finished_at'])
+    return job
+
+
+def work(poll_interval=1.0, once=False):
+    """Process jobs until interrupted (or until the queue is empty with ``once``)."""
+    while True:
+        close_old_connections()
+        job = claim_next_job()
+        if job is not None:
+            logger.info('Running export job %s (%s)', job.id, job.kind)
+            run_job(job)
+            continue
+        if once:
+            return
+        time.sleep(poll_interval)
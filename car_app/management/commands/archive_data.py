@@ -0,0 +1,54 @@
+import time
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from car_app.archive import ARCHIVE_BATCH_SIZE, archivable_cars, archivable_expenses, archive_cutoff, archive_user
+
+
+class Command(BaseCommand):
+    help = 'نقل السيارات المباعة ومبيعاتها والمصروفات الأقدم من تاريخ القطع إلى جداول الأرشيف'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', default=None,
+                            help='تاريخ القطع YYYY-MM-DD (الافتراضي: اليوم - ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--days', type=int, default=None, help='أرشفة ما هو أقدم من هذا العدد من الأيام')
+        parser.add_argument('--username', default=None, help='مستخدم واحد فقط (الافتراضي: الكل)')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='عدد الصفوف في كل معاملة')
+        parser.add_argument('--dry-run', action='store_true', help='عرض عدد الصفوف دون نقلها')
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                cutoff = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError('تاريخ القطع يجب أن يكون بصيغة YYYY-MM-DD')
+        else:
+            cutoff = archive_cutoff(options['days'])
+        if options['batch_size'] < 1:
+            raise CommandError('حجم الدفعة يجب أن يكون 1 على الأقل')
+
+        users = User.objects.order_by('pk')
+        if options['username']:
+            users = users.filter(username=options['username'])
+            if not users.exists():
+                raise CommandError(f'المستخدم {options["username"]} غير موجود')
+
+        start = time.perf_counter()
+        cars = expenses = 0
+        for user_id, username in users.values_list('pk', 'username'):
+            if options['dry_run']:
+                result = (archivable_cars(cutoff, user_id).count(), archivable_expenses(cutoff, user_id).count())
+            else:
+                result = archive_user(user_id, cutoff, options['batch_size'])
+            if any(result):
+                self.stdout.write(f'  {username}: {result[0]} سيارة، {result[1]} مصروف')
+            cars += result[0]
+            expenses += result[1]
+        elapsed = time.perf_counter() - start
+
+        action = 'ستُنقل' if options['dry_run'] else 'تم نقل'
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {action} {cars} سيارة مباعة و {expenses} مصروف أقدم من {cutoff} إلى الأرشيف في {elapsed:.1f} ثانية'
+        ))
@@ -0,0 +1,166 @@
+import json
+import platform
+import random
+import time
+import tracemalloc
+from urllib.parse import urlsplit
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import JsonResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from car_app import api
+from car_app.filters import filter_cars, filter_sales
+from car_app.pagination import api_page, paginate_request
+from car_app.seeding import seed_user
+
+
+def legacy_car_list(request):
+    """The previous api_car_list: model instances, get_*_display() and float() per row."""
+    page = paginate_request(request, filter_cars(request.user, request.GET))
+    data = [
+        {
+            'id': car.id,
+            'car_type': car.get_car_type_display(),
+            'year': car.year,
+            'chassis_number': car.chassis_number,
+            'purchase_date': car.purchase_date.isoformat(),
+            'purchase_value': float(car.purchase_value),
+            'status': car.get_status_display(),
+        }
+        for car in page.items
+    ]
+    return JsonResponse(api_page(request, page, data))
+
+
+def legacy_sales_list(request):
+    """The previous api_sales_list, with select_related('car')."""
+    page = paginate_request(request, filter_sales(request.user, request.GET).select_related('car'))
+    data = [
+        {
+            'id': sale.id,
+            'car': sale.car.get_car_type_display(),
+            'chassis_number': sale.car.chassis_number,
+            'sale_date': sale.sale_date.isoformat(),
+            'sale_value': float(sale.sale_value),
+            'purchase_value': float(sale.car.purchase_value),
+            'total_profit': float(sale.total_profit),
+            'partial_profit': float(sale.partial_profit),
+        }
+        for sale in page.items
+    ]
+    return JsonResponse(api_page(request, page, data))
+
+
+# (اسم السيناريو، اسم المسار، دالة العرض)
+SCENARIOS = [
+    ('cars_legacy', 'api_car_list', legacy_car_list),
+    ('cars_values', 'api_car_list', api.api_car_list),
+    ('sales_legacy', 'api_sales_list', legacy_sales_list),
+    ('sales_values', 'api_sales_list', api.api_sales_list),
+]
+
+
+def walk_pages(view, user, path, page_size, max_pages):
+    """Request every page of ``path`` through ``view``; return the row count, bytes and queries."""
+    factory = RequestFactory()
+    url = f'{path}?page_size={page_size}'
+    rows = pages = size = 0
+    with CaptureQueriesContext(connection) as queries:
+        while url and pages < max_pages:
+            request = factory.get(url)
+            request.user = user
+            response = view(request)
+            if hasattr(response, 'render'):
+                response.render()
+            body = json.loads(response.content)
+            rows += len(body['results'])
+            size += len(response.content)
+            pages += 1
+            url = body['next'] and '?'.join(filter(None, urlsplit(body['next'])[2:4]))
+    return rows, pages, size, queries.captured_queries
+
+
+def run_scenario(view, user, path, page_size, max_pages):
+    """Time one walk over the pages, then repeat it under tracemalloc for the peak memory.
+
+    A first page is requested beforehand so one-time imports and caches
+    are not counted.
+    """
+    walk_pages(view, user, path, page_size, 2)
+    start = time.perf_counter()
+    rows, pages, size, queries = walk_pages(view, user, path, page_size, max_pages)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    walk_pages(view, user, path, page_size, max_pages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'rows': rows,
+        'pages': pages,
+        'seconds': round(elapsed, 4),
+        'rows_per_second': round(rows / elapsed) if elapsed else None,
+        'queries': len(queries),
+        'sql_seconds': round(sum(float(q['time']) for q in queries), 4),
+        'peak_memory_bytes': peak,
+        'response_bytes': size,
+    }
+
+
+class Command(BaseCommand):
+    help = 'مقارنة سرعة وذاكرة الواجهة البرمجية القديمة (كائنات النماذج) بالجديدة (values)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000', help='أحجام البيانات (عدد السيارات) مفصولة بفواصل')
+        parser.add_argument('--page-size', type=int, default=500, help='عدد الصفوف في كل صفحة')
+        parser.add_argument('--max-pages', type=int, default=50, help='أكبر عدد من الصفحات في كل سيناريو')
+        parser.add_argument('--output', default=None, help='ملف JSON للنتائج (الافتراضي: الشاشة)')
+        parser.add_argument('--keep', action='store_true', help='عدم حذف مستخدمي القياس بعد الانتهاء')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'page_size': options['page_size'],
+            'results': [],
+        }
+
+        for size in sizes:
+            user = self._seed(size)
+            try:
+                for name, url_name, view in SCENARIOS:
+                    result = run_scenario(view, user, reverse(url_name), options['page_size'], options['max_pages'])
+                    result.update({'scenario': name, 'cars': size})
+                    report['results'].append(result)
+                    self.stderr.write(
+                        f'{name} @ {size}: {result["rows_per_second"]} rows/s, '
+                        f'{result["peak_memory_bytes"] // 1024} KiB peak'
+                    )
+            finally:
+                if not options['keep']:
+                    user.delete()
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+    def _seed(self, size):
+        username = f'benchmark_api_{size}'
+        User.objects.filter(username=username).delete()
+        user = User.objects.create(username=username)
+        self.stderr.write(f'seeding {size} cars for {username}...')
+        seed_user(user, cars=size, expenses=1, rng=random.Random(size))
+        return user
@@ -0,0 +1,117 @@
+import json
+import platform
+import random
+import time
+import tracemalloc
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from car_app import arabic_text
+from car_app.seeding import seed_user
+
+# (اسم السيناريو، اسم المسار) - كل سيناريو طلب GET واحد بمستخدم مسجل الدخول
+SCENARIOS = [
+    ('export_cars_pdf', 'export_cars_pdf'),
+    ('export_sales_pdf', 'export_sales_pdf'),
+    ('export_sales_excel', 'export_sales_excel'),
+    ('dashboard', 'dashboard'),
+    ('api_car_list', 'api_car_list'),
+    ('api_sales_list', 'api_sales_list'),
+]
+
+
+def run_scenario(client, url):
+    """Request ``url`` and consume the whole body; return timings, queries and memory."""
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = client.get(url)
+        first_byte = time.perf_counter() - start
+        if response.streaming:
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+        elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'status': response.status_code,
+        'seconds': round(elapsed, 4),
+        'first_byte_seconds': round(first_byte, 4),
+        'queries': len(queries.captured_queries),
+        'sql_seconds': round(sum(float(q['time']) for q in queries.captured_queries), 4),
+        'peak_memory_bytes': peak,
+        'response_bytes': size,
+    }
+
+
+class Command(BaseCommand):
+    help = 'قياس زمن وذاكرة التصدير ولوحة التحكم والواجهات البرمجية عند أحجام بيانات مختلفة'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000',
+                            help='أحجام البيانات (عدد السيارات) مفصولة بفواصل')
+        parser.add_argument('--scenarios', default=None,
+                            help='أسماء السيناريوهات مفصولة بفواصل (الافتراضي: الكل)')
+        parser.add_argument('--repeat', type=int, default=1, help='عدد مرات تكرار كل سيناريو')
+        parser.add_argument('--output', default=None, help='ملف JSON للنتائج (الافتراضي: الشاشة)')
+        parser.add_argument('--keep', action='store_true', help='عدم حذف مستخدمي القياس بعد الانتهاء')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        scenarios = SCENARIOS
+        if options['scenarios']:
+            wanted = set(options['scenarios'].split(','))
+            scenarios = [scenario for scenario in SCENARIOS if scenario[0] in wanted]
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'results': [],
+        }
+
+        # ذاكرة التصدير المؤقتة تُعطّل حتى يُقاس العمل الفعلي في كل مرة
+        with override_settings(EXPORT_CACHE_MAX_BYTES=0):
+            for size in sizes:
+                user = self._seed(size)
+                client = Client()
+                client.force_login(user)
+                try:
+                    for name, url_name in scenarios:
+                        for attempt in range(options['repeat']):
+                            arabic_text.clear_cache()
+                            result = run_scenario(client, reverse(url_name))
+                            result.update({'scenario': name, 'rows': size, 'attempt': attempt + 1})
+                            result['shaping_cache'] = arabic_text.cache_stats()
+                            report['results'].append(result)
+                            self.stderr.write(
+                                f'{name} @ {size}: {result["seconds"]}s, {result["queries"]} queries, '
+                                f'{result["peak_memory_bytes"] // 1024} KiB peak'
+                            )
+                finally:
+                    if not options['keep']:
+                        user.delete()
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+    def _seed(self, size):
+        username = f'benchmark_{size}'
+        User.objects.filter(username=username).delete()
+        user = User.objects.create(username=username)
+        self.stderr.write(f'seeding {size} cars for {username}...')
+        seed_user(user, cars=size, expenses=max(size // 10, 1), rng=random.Random(size))
+        return user
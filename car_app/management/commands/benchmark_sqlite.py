@@ -0,0 +1,220 @@
+import json
+import os
+import platform
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import suppress
+from datetime import date, timedelta
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.utils import timezone
+
+from car_app.exports import raw_export_rows
+from car_app.filters import filter_cars
+from car_app.models import Car, Sale
+from car_app.rollups import dashboard_totals
+from car_app.seeding import CAR_NAMES, seed_user
+
+# الاسم: (ENGINE و OPTIONS لقاعدة البيانات، اتصال دائم)
+# "default" هو سلوك Django بلا إعدادات: سجل rollback و BEGIN مؤجل وإغلاق الاتصال بعد كل طلب؛
+# "production" هو settings.SQLITE_PRODUCTION_DATABASE (المفعّل بـ CAR_APP_SQLITE_PRODUCTION=1)
+PROFILES = {
+    'default': ({'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {}}, False),
+    'production': (None, True),
+}
+
+READS = ('car_page', 'dashboard', 'sales_export')
+
+
+def profile_database(profile):
+    """``(ENGINE and OPTIONS, persistent)`` of a benchmark profile."""
+    database, persistent = PROFILES[profile]
+    if database is None:
+        database = {key: settings.SQLITE_PRODUCTION_DATABASE[key] for key in ('ENGINE', 'OPTIONS')}
+    return database, persistent
+
+
+def use_database(path, database):
+    """Point the default connection of this process at ``path`` with the ENGINE and OPTIONS in ``database``."""
+    connections.close_all()
+    connections.databases['default'].update(database, NAME=path)
+    # المحرك يُختار عند إنشاء الاتصال، فيُحذف الاتصال الحالي ليُنشأ من جديد بالإعدادات الجديدة
+    with suppress(AttributeError):
+        del connections['default']
+
+
+def _init_process(path, database):
+    django.setup()
+    use_database(path, database)
+
+
+def _read(user, kind):
+    if kind == 'car_page':
+        list(filter_cars(user, {}).values('id', 'name', 'purchase_date', 'purchase_value')[:50])
+    elif kind == 'dashboard':
+        dashboard_totals(user)
+    else:
+        # تصدير المبيعات: قراءة طويلة تتداخل مع الكتابة
+        for _ in raw_export_rows('sales', user, {}):
+            pass
+
+
+def _write(user, rng, worker, index):
+    # مثل add_car ثم add_sale: إنشاء السيارة، ثم البيع وتحديث حالتها
+    today = date.today()
+    car = Car.objects.create(
+        user=user,
+        name=rng.choice(CAR_NAMES),
+        car_type='sedan',
+        year=2020,
+        chassis_number=f'BENCH{worker}-{index}',
+        purchase_date=today - timedelta(days=rng.randrange(365)),
+        purchase_value=Decimal(rng.randrange(20000, 200000)),
+    )
+    Sale.objects.create(car=car, sale_date=today, sale_value=car.purchase_value + 5000, partial_profit=0)
+    car.status = 'sold'
+    car.save()
+
+
+def run_worker(user_id, worker, seconds, write_ratio, persistent):
+    """Run reads and writes against the default database for ``seconds``; return latencies and errors."""
+    user = User.objects.get(pk=user_id)
+    rng = random.Random(worker)
+    result = {'read': [], 'write': [], 'read_errors': 0, 'write_errors': 0}
+    deadline = time.perf_counter() + seconds
+    index = 0
+    while time.perf_counter() < deadline:
+        kind = 'write' if rng.random() < write_ratio else 'read'
+        start = time.perf_counter()
+        try:
+            if kind == 'write':
+                index += 1
+                _write(user, rng, worker, index)
+            else:
+                _read(user, rng.choice(READS))
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            result[f'{kind}_errors'] += 1
+        else:
+            result[kind].append(time.perf_counter() - start)
+        finally:
+            if not persistent:
+                # CONN_MAX_AGE = 0: كل طلب يفتح اتصالاً جديداً
+                connection.close()
+    connection.close()
+    return result
+
+
+def _thread_worker(args):
+    return run_worker(*args)
+
+
+def _percentile_ms(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(int(len(values) * fraction), len(values) - 1)] * 1000, 2)
+
+
+def summarize(results, seconds):
+    summary = {}
+    for kind in ('read', 'write'):
+        latencies = [latency for result in results for latency in result[kind]]
+        summary[f'{kind}s_per_second'] = round(len(latencies) / seconds, 1)
+        summary[f'{kind}_p50_ms'] = _percentile_ms(latencies, 0.5)
+        summary[f'{kind}_p95_ms'] = _percentile_ms(latencies, 0.95)
+        summary[f'{kind}_lock_errors'] = sum(result[f'{kind}_errors'] for result in results)
+    return summary
+
+
+class Command(BaseCommand):
+    help = 'قياس سرعة القراءة والكتابة وأخطاء القفل في SQLite بإعدادات Django الافتراضية مقابل إعدادات الإنتاج'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cars', type=int, default=5000, help='عدد السيارات في بيانات القياس')
+        parser.add_argument('--threads', type=int, default=8, help='عدد الخيوط في قياس الخيوط (0 لتخطيه)')
+        parser.add_argument('--processes', type=int, default=4, help='عدد العمليات في قياس العمليات (0 لتخطيه)')
+        parser.add_argument('--seconds', type=float, default=10, help='مدة كل قياس بالثواني')
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='نسبة عمليات الكتابة')
+        parser.add_argument('--profiles', default=','.join(PROFILES), help='الإعدادات المقاسة مفصولة بفواصل')
+        parser.add_argument('--output', default=None, help='ملف JSON للنتائج (الافتراضي: الشاشة)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('هذا القياس خاص بـ SQLite')
+        profiles = [name for name in options['profiles'].split(',') if name]
+        unknown = set(profiles) - set(PROFILES)
+        if unknown:
+            raise CommandError(f'إعدادات غير معروفة: {", ".join(sorted(unknown))}')
+
+        original = {key: connections.databases['default'][key] for key in ('ENGINE', 'OPTIONS')}
+        original_path = connections.databases['default']['NAME']
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'cpus': os.cpu_count(),
+            'cars': options['cars'],
+            'write_ratio': options['write_ratio'],
+            'seconds': options['seconds'],
+            'results': [],
+        }
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                for profile in profiles:
+                    database, persistent = profile_database(profile)
+                    for mode, workers in (('threads', options['threads']), ('processes', options['processes'])):
+                        if not workers:
+                            continue
+                        # قاعدة جديدة لكل قياس حتى لا تؤثر كتابات قياس على الذي يليه
+                        path = os.path.join(directory, f'{profile}_{mode}.sqlite3')
+                        user_id = self._prepare(path, database, options['cars'])
+                        result = self._run(mode, workers, path, database, persistent, user_id, options)
+                        result.update({'profile': profile, 'mode': mode, 'workers': workers})
+                        report['results'].append(result)
+                        self.stderr.write(
+                            f'{profile} / {workers} {mode}: '
+                            f'{result["reads_per_second"]} reads/s, {result["writes_per_second"]} writes/s, '
+                            f'{result["read_lock_errors"] + result["write_lock_errors"]} lock errors'
+                        )
+                connections.close_all()
+        finally:
+            use_database(original_path, original)
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+    def _prepare(self, path, database, cars):
+        use_database(path, database)
+        self.stderr.write(f'migrating and seeding {cars} cars in {os.path.basename(path)}...')
+        call_command('migrate', verbosity=0, interactive=False)
+        user = User.objects.create(username='benchmark_sqlite')
+        seed_user(user, cars=cars, expenses=cars // 10, rng=random.Random(cars))
+        # العمليات الفرعية تفتح اتصالاتها الخاصة
+        connections.close_all()
+        return user.pk
+
+    def _run(self, mode, workers, path, database, persistent, user_id, options):
+        tasks = [(user_id, worker, options['seconds'], options['write_ratio'], persistent) for worker in range(workers)]
+        if mode == 'threads':
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_thread_worker, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_process,
+                                     initargs=(path, database)) as pool:
+                results = list(pool.map(run_worker, *zip(*tasks)))
+        return summarize(results, options['seconds'])
@@ -0,0 +1,47 @@
+import csv
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from car_app.imports import IMPORTERS, ImportFileError, import_file
+
+
+class Command(BaseCommand):
+    help = 'استيراد سيارات أو مصروفات مستخدم من ملف CSV أو XLSX دفعة واحدة'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='اسم المستخدم صاحب البيانات')
+        parser.add_argument('kind', choices=sorted(IMPORTERS), help='نوع البيانات')
+        parser.add_argument('path', help='مسار ملف CSV أو XLSX')
+        parser.add_argument('--batch-size', type=int, default=2000, help='عدد الصفوف في كل دفعة')
+        parser.add_argument('--errors-csv', default=None, help='حفظ تقرير أخطاء الصفوف في ملف CSV')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'المستخدم {options["username"]} غير موجود')
+
+        start = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as upload:
+                result = import_file(user, options['kind'], upload, options['path'], options['batch_size'])
+        except OSError as exc:
+            raise CommandError(f'تعذر فتح الملف: {exc}')
+        except ImportFileError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - start
+
+        for error in result.errors[:20]:
+            self.stdout.write(f'  السطر {error.line}: {error.field or "-"}: {error.message}')
+        if options['errors_csv'] and result.errors:
+            with open(options['errors_csv'], 'w', newline='', encoding='utf-8-sig') as report:
+                writer = csv.writer(report)
+                writer.writerow(['line', 'field', 'message'])
+                writer.writerows(result.errors)
+            self.stdout.write(f'تقرير الأخطاء: {options["errors_csv"]}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ تم استيراد {result.created} صف في {elapsed:.1f} ثانية ({result.error_count} خطأ)'
+        ))
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from car_app.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = ('حذف سجلات الحذف (للمزامنة) الأقدم من SYNC_TOMBSTONE_RETENTION_DAYS - يُشغّل يومياً؛ '
+            'التطبيق الذي لم يزامن خلال هذه المدة يُطلب منه مزامنة كاملة')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='عرض عدد السجلات دون حذفها')
+
+    def handle(self, *args, **options):
+        count = prune_tombstones(dry_run=options['dry_run'])
+        action = 'سيُحذف' if options['dry_run'] else 'تم حذف'
+        days = getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 90)
+        self.stdout.write(self.style.SUCCESS(f'✓ {action} {count} سجل حذف أقدم من {days} يوماً'))
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from car_app import rollups
+
+
+class Command(BaseCommand):
+    help = 'إعادة بناء الملخص الشهري للوحة التحكم من جداول السيارات والمبيعات والمصروفات'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, default=None, help='مستخدم واحد فقط (الافتراضي: الكل)')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = rollups.rebuild(options['user_id'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'✓ تم بناء {count} صف شهري في {elapsed:.1f} ثانية'))
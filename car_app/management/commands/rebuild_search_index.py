@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from car_app import search
+
+
+class Command(BaseCommand):
+    help = 'إعادة بناء فهرس البحث النصي للسيارات من جدول السيارات'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError('فهرس البحث متاح على SQLite فقط')
+        start = time.perf_counter()
+        count = search.rebuild_index(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'✓ تمت فهرسة {count} سيارة في {elapsed:.1f} ثانية'))
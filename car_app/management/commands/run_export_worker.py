@@ -0,0 +1,62 @@
+import multiprocessing
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from car_app.jobs import requeue_stale_jobs, work
+
+
+def _worker_main(poll_interval, once):
+    # ضروري عند تشغيل العمليات بطريقة spawn (Windows/macOS)
+    django.setup()
+    try:
+        work(poll_interval=poll_interval, once=once)
+    except KeyboardInterrupt:
+        pass
+
+
+class Command(BaseCommand):
+    help = 'تشغيل عمال تصدير ملفات PDF و Excel في الخلفية'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2,
+                            help='عدد العمليات التي تعالج الطابور بالتوازي')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='عدد الثواني بين كل فحص للطابور عندما يكون فارغاً')
+        parser.add_argument('--once', action='store_true',
+                            help='معالجة المهام الموجودة ثم الخروج')
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f'أعيدت {requeued} مهمة متوقفة إلى الطابور')
+
+        workers = max(options['workers'], 1)
+        poll_interval = options['poll_interval']
+        once = options['once']
+        self.stdout.write(f'✓ بدء {workers} عامل تصدير')
+
+        if workers == 1:
+            try:
+                work(poll_interval=poll_interval, once=once)
+            except KeyboardInterrupt:
+                pass
+            return
+
+        # لا يجوز مشاركة اتصال قاعدة البيانات بين العمليات
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=_worker_main, args=(poll_interval, once))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
@@ -0,0 +1,38 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from car_app.seeding import seed_users
+
+
+class Command(BaseCommand):
+    help = 'إنشاء مستخدمين ببيانات تجريبية (سيارات ومبيعات ومصروفات) بأحجام الإنتاج'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1)
+        parser.add_argument('--cars', type=int, default=1000, help='عدد السيارات لكل مستخدم')
+        parser.add_argument('--sales-ratio', type=float, default=0.6, help='نسبة السيارات المباعة')
+        parser.add_argument('--expenses', type=int, default=300, help='عدد المصروفات لكل مستخدم')
+        parser.add_argument('--prefix', default='seed', help='بادئة أسماء المستخدمين')
+        parser.add_argument('--password', default=None, help='كلمة مرور المستخدمين (بدون كلمة مرور إذا لم تُحدد)')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=None, help='بذرة المولد العشوائي لنتائج قابلة للتكرار')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        users = seed_users(
+            options['users'],
+            options['cars'],
+            options['expenses'],
+            prefix=options['prefix'],
+            password=options['password'],
+            sales_ratio=options['sales_ratio'],
+            batch_size=options['batch_size'],
+            rng=random.Random(options['seed']) if options['seed'] is not None else None,
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ تم إنشاء بيانات {len(users)} مستخدم '
+            f'({options["cars"]} سيارة و {options["expenses"]} مصروف لكل مستخدم) في {elapsed:.1f} ثانية'
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 04:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('car_app', '0004_dataversion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='kind',
+            field=models.CharField(choices=[('cars_pdf', 'قائمة السيارات PDF'), ('sales_pdf', 'قائمة المبيعات PDF'), ('sales_excel', 'قائمة المبيعات Excel'), ('full_report', 'التقرير الشامل Excel')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('car_app', '0005_exportjob_full_report'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['user', 'status', 'purchase_date'], name='car_app_car_user_id_530b0b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['user', 'clearance_type'], name='car_app_car_user_id_22956d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['user', 'purchase_date'], name='car_app_car_user_id_923d24_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlyexpense',
+            index=models.Index(fields=['user', 'date'], name='car_app_mon_user_id_51913f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['sale_date'], name='car_app_sal_sale_da_23a4d0_idx'),
+        ),
+    ]
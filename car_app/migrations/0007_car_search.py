@@ -0,0 +1,75 @@
+import re
+
+from django.db import migrations
+
+FTS_TABLE = 'car_app_car_search'
+
+# نسخة من car_app.search وقت كتابة الترحيل: الترحيل لا يستورد كود التطبيق حتى لا يتغير سلوكه
+# مع تعديلات لاحقة على البحث، وrebuild_search_index يعيد بناء الجدول بالتوحيد الحالي
+FTS_COLUMNS = ('owner', 'name', 'car_type', 'chassis_number')
+
+INSERT_SQL = (
+    f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FTS_COLUMNS)}) '
+    f'VALUES (%s, {", ".join(["%s"] * len(FTS_COLUMNS))})'
+)
+
+DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+
+LETTER_VARIANTS = str.maketrans({
+    'أ': 'ا',
+    'إ': 'ا',
+    'آ': 'ا',
+    'ٱ': 'ا',
+    'ى': 'ي',
+    'ئ': 'ي',
+    'ؤ': 'و',
+    'ة': 'ه',
+})
+
+
+def normalize(text):
+    if not text:
+        return ''
+    text = DIACRITICS.sub('', str(text))
+    return text.translate(LETTER_VARIANTS).lower()
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Car = apps.get_model('car_app', 'Car')
+    car_type_labels = dict(Car._meta.get_field('car_type').choices)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"{', '.join(FTS_COLUMNS)}, tokenize='unicode61', prefix='2 3 4')"
+        )
+        rows = Car.objects.values_list('id', 'user_id', 'name', 'car_type', 'chassis_number')
+        cursor.executemany(INSERT_SQL, [
+            (
+                car_id,
+                f'u{user_id}',
+                normalize(name),
+                normalize(f'{car_type} {car_type_labels.get(car_type, "")}'),
+                normalize(chassis_number),
+            )
+            for car_id, user_id, name, car_type, chassis_number in rows
+        ])
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('car_app', '0006_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
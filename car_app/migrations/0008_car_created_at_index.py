@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 04:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('car_app', '0007_car_search'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='car',
+            name='car_app_car_user_id_22956d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['user', 'clearance_type', 'created_at'], name='car_app_car_user_id_62cb5d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['user', 'created_at'], name='car_app_car_user_id_709d3b_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 04:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('car_app', '0009_monthlyrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlyexpense',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
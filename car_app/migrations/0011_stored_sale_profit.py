@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-18 05:00
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def fill_total_profit(apps, schema_editor):
+    Car = apps.get_model('car_app', 'Car')
+    Sale = apps.get_model('car_app', 'Sale')
+
+    purchase_value = Car.objects.filter(pk=OuterRef('car_id')).values('purchase_value')[:1]
+    Sale.objects.update(total_profit=F('sale_value') - Subquery(purchase_value))
+    # MonthlyRollup.total_profit يُملأ في 0012
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('car_app', '0010_monthlyexpense_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlyrollup',
+            name='total_profit',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='sale',
+            name='total_profit',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=13),
+        ),
+        migrations.RunPython(fill_total_profit, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2 on 2026-10-18 05:03
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_rollups(apps, schema_editor):
+    # أول ترحيل تتوفر فيه كل أعمدة الملخص، فيُبنى الجدول هنا كاملاً. التجميع نسخة من
+    # car_app.rollups.compute_rollups بالنماذج التاريخية فقط، حتى لا تكسر تعديلاته اللاحقة الترحيل
+    Car = apps.get_model('car_app', 'Car')
+    Sale = apps.get_model('car_app', 'Sale')
+    MonthlyExpense = apps.get_model('car_app', 'MonthlyExpense')
+    MonthlyRollup = apps.get_model('car_app', 'MonthlyRollup')
+
+    rows = defaultdict(dict)
+    car_rows = (Car.objects.order_by().annotate(month=TruncMonth('purchase_date'))
+                .values('user_id', 'month')
+                .annotate(bought=Count('id'), sold=Count('id', filter=Q(status='sold'))))
+    for row in car_rows:
+        rows[(row['user_id'], row['month'])].update(cars_bought=row['bought'], cars_sold=row['sold'])
+
+    sale_rows = (Sale.objects.order_by().annotate(month=TruncMonth('sale_date'))
+                 .values('car__user_id', 'month')
+                 .annotate(revenue=Sum('sale_value'), profit=Sum('partial_profit'),
+                           total=Sum('total_profit'), count=Count('id')))
+    for row in sale_rows:
+        rows[(row['car__user_id'], row['month'])].update(
+            revenue=row['revenue'] or Decimal('0.00'),
+            partial_profit=row['profit'] or Decimal('0.00'),
+            total_profit=row['total'] or Decimal('0.00'),
+            sale_count=row['count'],
+        )
+
+    expense_rows = (MonthlyExpense.objects.order_by().annotate(month=TruncMonth('date'))
+                    .values('user_id', 'month')
+                    .annotate(total=Sum('amount')))
+    for row in expense_rows:
+        rows[(row['user_id'], row['month'])]['expense_total'] = row['total'] or Decimal('0.00')
+
+    MonthlyRollup.objects.all().delete()
+    MonthlyRollup.objects.bulk_create(
+        [MonthlyRollup(user_id=user_id, month=month, **values) for (user_id, month), values in rows.items()],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('car_app', '0011_stored_sale_profit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlyrollup',
+            name='revenue',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=15),
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2 on 2026-10-18 05:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('car_app', '0012_monthlyrollup_revenue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('car', 'سيارة'), ('sale', 'بيع'), ('expense', 'مصروف')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['deleted_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['user', 'updated_at'], name='car_app_car_user_id_05fcd4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlyexpense',
+            index=models.Index(fields=['user', 'updated_at'], name='car_app_mon_user_id_69017b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['updated_at'], name='car_app_sal_updated_47484f_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['user', 'deleted_at'], name='car_app_tom_user_id_73f888_idx'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2 on 2026-10-18 05:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('car_app', '0013_sync_tombstones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedCar',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, default='', max_length=150, null=True)),
+                ('car_type', models.CharField(choices=[('sedan', 'سيارة سيدان'), ('suv', 'سيارة SUV'), ('truck', 'شاحنة'), ('van', 'فان'), ('coupe', 'كوبيه'), ('hatchback', 'هاتشباك')], max_length=50)),
+                ('year', models.IntegerField()),
+                ('chassis_number', models.CharField(max_length=50)),
+                ('purchase_date', models.DateField()),
+                ('purchase_value', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('clearance_type', models.CharField(choices=[('purchase', 'شراء'), ('auction', 'إعلان')], max_length=20)),
+                ('status', models.CharField(choices=[('available', 'غير مباع'), ('sold', 'مباع')], default='sold', max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_cars', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedSale',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('sale_date', models.DateField()),
+                ('sale_value', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('partial_profit', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_profit', models.DecimalField(decimal_places=2, default=0, max_digits=13)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('car', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sale', to='car_app.archivedcar')),
+            ],
+            options={
+                'ordering': ['-sale_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedMonthlyExpense',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('description', models.CharField(max_length=255)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('date', models.DateField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_expenses', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedsale',
+            index=models.Index(fields=['sale_date'], name='car_app_arc_sale_da_103be6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedmonthlyexpense',
+            index=models.Index(fields=['user', 'date'], name='car_app_arc_user_id_0d4624_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcar',
+            index=models.Index(fields=['user', 'purchase_date'], name='car_app_arc_user_id_26544f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcar',
+            index=models.Index(fields=['user', 'created_at'], name='car_app_arc_user_id_ff0077_idx'),
+        ),
+    ]
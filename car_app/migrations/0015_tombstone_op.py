@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 05:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('car_app', '0014_archive_tables'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tombstone',
+            name='op',
+            field=models.CharField(choices=[('delete', 'حذف'), ('archive', 'أرشفة')], default='delete', max_length=10),
+        ),
+    ]
@@ -36,27 +36,92 @@ class Car(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'status', 'purchase_date']),
+            # created_at يخدم الترتيب الافتراضي للقائمة مع تصفية نوع التخليص
+            models.Index(fields=['user', 'clearance_type', 'created_at']),
+            models.Index(fields=['user', 'purchase_date']),
+            models.Index(fields=['user', 'created_at']),
+            # المزامنة تقرأ ما تغير منذ آخر مؤشر
+            models.Index(fields=['user', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.chassis_number}"
 
 
+# جداول التسميات تُبنى مرة واحدة بدل get_*_display() لكل صف
+CAR_TYPE_LABELS = dict(Car.CAR_TYPE_CHOICES)
+CLEARANCE_LABELS = dict(Car.CLEARANCE_CHOICES)
+STATUS_LABELS = dict(Car.STATUS_CHOICES)
+
+
+class SaleQuerySet(models.QuerySet):
+    """استعلامات المبيعات حسب الربح المخزن (سعر البيع - سعر شراء السيارة)"""
+
+    def losses(self):
+        return self.filter(total_profit__lt=0)
+
+    def gains(self):
+        return self.filter(total_profit__gt=0)
+
+    def by_profit(self, descending=True):
+        return self.order_by('-total_profit' if descending else 'total_profit')
+
+    def with_profit_margin(self):
+        """Annotate ``profit_margin``: total profit as a percentage of the purchase value."""
+        return self.annotate(profit_margin=models.Case(
+            models.When(car__purchase_value=0, then=models.Value(None)),
+            default=models.F('total_profit') * 100 / models.F('car__purchase_value'),
+            output_field=models.DecimalField(max_digits=14, decimal_places=2),
+        ))
+
+    def profit_totals(self):
+        """Total profit, partial profit and sale count in one aggregate query."""
+        totals = self.aggregate(
+            total_profit=models.Sum('total_profit'),
+            partial_profit=models.Sum('partial_profit'),
+            count=models.Count('id'),
+        )
+        totals['total_profit'] = totals['total_profit'] or 0
+        totals['partial_profit'] = totals['partial_profit'] or 0
+        return totals
+
+
 class Sale(models.Model):
     car = models.OneToOneField(Car, on_delete=models.CASCADE, related_name='sale')
     sale_date = models.DateField()
     sale_value = models.DecimalField(max_digits=12, decimal_places=2)
     partial_profit = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # سعر البيع - سعر شراء السيارة، يُحسب عند الحفظ ويُحدّث عند تعديل سعر الشراء
+    total_profit = models.DecimalField(max_digits=13, decimal_places=2, default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = SaleQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-sale_date']
+        indexes = [
+            models.Index(fields=['sale_date']),
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         return f"بيع {self.car} - {self.sale_date}"
     
-    def get_total_profit(self):
+    def save(self, *args, **kwargs):
+        self.total_profit = self.compute_total_profit()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'total_profit' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'total_profit']
+        super().save(*args, **kwargs)
+    
+    def compute_total_profit(self):
         return self.sale_value - self.car.purchase_value
+    
+    def get_total_profit(self):
+        return self.total_profit
 
 
 class MonthlyExpense(models.Model):
@@ -65,9 +130,208 @@ class MonthlyExpense(models.Model):
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date']),
+            models.Index(fields=['user', 'updated_at']),
+        ]
     
     def __str__(self):
         return f"{self.description} - {self.amount} - {self.date}"
+
+
+class ExportJob(models.Model):
+    KIND_CHOICES = [
+        ('cars_pdf', 'قائمة السيارات PDF'),
+        ('sales_pdf', 'قائمة المبيعات PDF'),
+        ('sales_excel', 'قائمة المبيعات Excel'),
+        ('full_report', 'التقرير الشامل Excel'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'في الانتظار'),
+        ('running', 'قيد التنفيذ'),
+        ('done', 'مكتمل'),
+        ('failed', 'فشل'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs')
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to='exports/', blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.get_status_display()}"
+
+
+class DataVersion(models.Model):
+    """عداد يزداد مع كل تعديل على سيارات أو مبيعات أو مصروفات المستخدم"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='data_version')
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user} - {self.version}"
+
+    @classmethod
+    def current(cls, user_id):
+        return cls.objects.filter(user_id=user_id).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls, user_id):
+        """Increase the data version of ``user_id`` by one."""
+        updated = cls.objects.filter(user_id=user_id).update(
+            version=models.F('version') + 1,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            obj, created = cls.objects.get_or_create(user_id=user_id, defaults={'version': 1})
+            if not created:
+                cls.objects.filter(user_id=user_id).update(
+                    version=models.F('version') + 1,
+                    updated_at=timezone.now(),
+                )
+
+
+class Tombstone(models.Model):
+    """سجل الحذف - صف لكل سيارة أو بيع أو مصروف محذوف أو مؤرشف حتى تزيله تطبيقات المزامنة من نسختها"""
+    KIND_CHOICES = [
+        ('car', 'سيارة'),
+        ('sale', 'بيع'),
+        ('expense', 'مصروف'),
+    ]
+
+    # archive: الصف نُقل إلى جداول الأرشيف وما زال موجوداً، ولم يعد ضمن المزامنة
+    OP_CHOICES = [
+        ('delete', 'حذف'),
+        ('archive', 'أرشفة'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tombstones')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    op = models.CharField(max_length=10, choices=OP_CHOICES, default='delete')
+    object_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.object_id} - {self.deleted_at}"
+
+
+class MonthlyRollup(models.Model):
+    """ملخص شهري لكل مستخدم تقرأ منه لوحة التحكم بدل جداول السيارات والمبيعات والمصروفات"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_rollups')
+    month = models.DateField()  # أول يوم في الشهر
+    # المبيعات حسب شهر تاريخ البيع
+    revenue = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    partial_profit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_profit = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    sale_count = models.PositiveIntegerField(default=0)
+    # المصروفات حسب شهر تاريخ المصروف
+    expense_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # السيارات حسب شهر الشراء، والمباعة منها حسب حالتها الحالية
+    cars_bought = models.PositiveIntegerField(default=0)
+    cars_sold = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['month']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'month'], name='unique_user_month_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.month:%Y-%m}"
+
+
+class ArchivedCar(models.Model):
+    """سيارة مباعة قديمة نُقلت من Car إلى الأرشيف مع بيعها - بنفس المعرف والأعمدة"""
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_cars')
+    name = models.CharField(max_length=150, null=True, blank=True, default='')
+    car_type = models.CharField(max_length=50, choices=Car.CAR_TYPE_CHOICES)
+    year = models.IntegerField()
+    # بلا unique: يمكن شراء نفس السيارة مرة أخرى بعد أرشفة بيعها
+    chassis_number = models.CharField(max_length=50)
+    purchase_date = models.DateField()
+    purchase_value = models.DecimalField(max_digits=12, decimal_places=2)
+    clearance_type = models.CharField(max_length=20, choices=Car.CLEARANCE_CHOICES)
+    status = models.CharField(max_length=20, choices=Car.STATUS_CHOICES, default='sold')
+    # تُنسخ كما هي من Car، لذلك بلا auto_now
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'purchase_date']),
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - {self.chassis_number}"
+
+
+class ArchivedSale(models.Model):
+    """بيع مؤرشف مع سيارته"""
+    id = models.BigIntegerField(primary_key=True)
+    car = models.OneToOneField(ArchivedCar, on_delete=models.CASCADE, related_name='sale')
+    sale_date = models.DateField()
+    sale_value = models.DecimalField(max_digits=12, decimal_places=2)
+    partial_profit = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_profit = models.DecimalField(max_digits=13, decimal_places=2, default=0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = SaleQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-sale_date']
+        indexes = [
+            models.Index(fields=['sale_date']),
+        ]
+
+    def __str__(self):
+        return f"بيع {self.car} - {self.sale_date}"
+
+
+class ArchivedMonthlyExpense(models.Model):
+    """مصروف قديم نُقل من MonthlyExpense إلى الأرشيف"""
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_expenses')
+    description = models.CharField(max_length=255)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    date = models.DateField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.description} - {self.amount} - {self.date}"
@@ -0,0 +1,181 @@
+"""
+ترقيم الصفحات بالمؤشر (keyset) - كل صفحة تبدأ بعد آخر صف في الصفحة السابقة،
+فتكلفة الصفحة العاشرة ألف مثل الأولى: لا OFFSET ولا COUNT(*)
+"""
+import base64
+import binascii
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import SuspiciousOperation, ValidationError
+from django.db.models import Q
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+CURSOR_PARAM = 'cursor'
+
+KeysetPage = namedtuple('KeysetPage', 'items next_cursor previous_cursor')
+
+
+class InvalidCursor(SuspiciousOperation):
+    """A cursor that was not produced by this ordering; Django answers it with 400."""
+
+
+def ordering_for(queryset):
+    """The queryset's ordering with an ``id`` tiebreaker in the same direction as the first field."""
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+    if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+        descending = bool(ordering) and ordering[0].startswith('-')
+        ordering.append('-id' if descending else 'id')
+    return ordering
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(ordering, values, direction):
+    payload = json.dumps([direction, ordering, [_encode_value(value) for value in values]],
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, ordering):
+    """``(direction, values)`` from ``cursor``; raises InvalidCursor if it does not fit ``ordering``."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, cursor_ordering, values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor(cursor)
+    if direction not in ('next', 'previous') or cursor_ordering != ordering or len(values) != len(ordering):
+        raise InvalidCursor(cursor)
+    return direction, values
+
+
+def _row_value(row, field):
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+def _after(ordering, values):
+    """Q for rows strictly after ``values`` in ``ordering`` (lexicographic row comparison).
+
+    The first field also gets an inclusive bound on its own so the database
+    can start an index range scan at the cursor instead of filtering the OR.
+    """
+    first = ordering[0]
+    condition = Q(**{f'{first.lstrip("-")}__{"lte" if first.startswith("-") else "gte"}': values[0]})
+    rows_after = Q()
+    for position, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[position]})
+        for previous_field, value in zip(ordering[:position], values):
+            step &= Q(**{previous_field.lstrip('-'): value})
+        rows_after |= step
+    return condition & rows_after
+
+
+def _reverse(ordering):
+    return [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+
+
+def page_size_from(params, default=PAGE_SIZE):
+    try:
+        size = int(params.get('page_size', default))
+    except (TypeError, ValueError):
+        return default
+    return min(max(size, 1), MAX_PAGE_SIZE)
+
+
+def paginate(queryset, cursor=None, page_size=PAGE_SIZE):
+    """Return one KeysetPage of ``queryset`` starting at ``cursor``.
+
+    The page is ordered by the queryset's ordering plus an ``id``
+    tiebreaker. One extra row is fetched to know whether another page
+    follows. Raises InvalidCursor if ``cursor`` was tampered with or
+    belongs to another ordering.
+    """
+    ordering = ordering_for(queryset)
+    direction, values = 'next', None
+    if cursor:
+        direction, values = decode_cursor(cursor, ordering)
+
+    fields = [field.lstrip('-') for field in ordering]
+    try:
+        if direction == 'previous':
+            rows = queryset.filter(_after(_reverse(ordering), values)).order_by(*_reverse(ordering))
+        else:
+            rows = queryset.filter(_after(ordering, values)) if values else queryset
+            rows = rows.order_by(*ordering)
+    except (ValidationError, ValueError, TypeError):
+        # قيم لا تناسب أنواع حقول الترتيب (مؤشر معدّل يدوياً)
+        raise InvalidCursor(cursor)
+
+    items = list(rows[:page_size + 1])
+    has_more = len(items) > page_size
+    items = items[:page_size]
+    if direction == 'previous':
+        items.reverse()
+
+    def cursor_at(row, cursor_direction):
+        return encode_cursor(ordering, [_row_value(row, field) for field in fields], cursor_direction)
+
+    next_cursor = previous_cursor = None
+    if items:
+        if has_more or direction == 'previous':
+            next_cursor = cursor_at(items[-1], 'next')
+        if values is not None and (direction == 'next' or has_more):
+            previous_cursor = cursor_at(items[0], 'previous')
+    return KeysetPage(items, next_cursor, previous_cursor)
+
+
+def page_url(request, cursor):
+    """Current URL with ``cursor`` replacing the cursor parameter, or None."""
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params[CURSOR_PARAM] = cursor
+    return f'{request.path}?{params.urlencode()}'
+
+
+def paginate_request(request, queryset, page_size=None):
+    """Paginate ``queryset`` using the request's cursor and page_size parameters."""
+    return paginate(
+        queryset,
+        request.GET.get(CURSOR_PARAM),
+        page_size or page_size_from(request.GET),
+    )
+
+
+def filter_query(request):
+    """The request's query string without the paging parameters, for export links."""
+    params = request.GET.copy()
+    for name in (CURSOR_PARAM, 'page_size'):
+        params.pop(name, None)
+    return params.urlencode()
+
+
+def page_links(request, page):
+    """Template context with the previous/next page URLs and the filters' query string."""
+    return {
+        'next_url': page_url(request, page.next_cursor),
+        'previous_url': page_url(request, page.previous_cursor),
+        'filter_query': filter_query(request),
+    }
+
+
+def api_page(request, page, results):
+    """JSON envelope for an API page: results plus absolute next/previous URLs."""
+    links = page_links(request, page)
+    return {
+        'results': results,
+        'next': request.build_absolute_uri(links['next_url']) if links['next_url'] else None,
+        'previous': request.build_absolute_uri(links['previous_url']) if links['previous_url'] else None,
+    }
@@ -0,0 +1,188 @@
+"""
+الملخص الشهري للوحة التحكم - صف لكل مستخدم لكل شهر يُحدّث مع كل تعديل،
+فتقرأ لوحة التحكم عدداً من الصفوف بعدد الأشهر بدل كل السيارات والمبيعات والمصروفات
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import Car, MonthlyExpense, MonthlyRollup, Sale
+
+ROLLUP_FIELDS = ('revenue', 'partial_profit', 'total_profit', 'sale_count', 'expense_total', 'cars_bought', 'cars_sold')
+
+
+def month_start(day):
+    if isinstance(day, str):
+        # create(date='2024-01-31') يمرر النص كما هو إلى الإشارات
+        day = date.fromisoformat(day[:10])
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _empty():
+    return {
+        'revenue': Decimal('0.00'),
+        'partial_profit': Decimal('0.00'),
+        'total_profit': Decimal('0.00'),
+        'sale_count': 0,
+        'expense_total': Decimal('0.00'),
+        'cars_bought': 0,
+        'cars_sold': 0,
+    }
+
+
+def _month_filter(field, months):
+    """Q limiting ``field`` to any of ``months`` (first days), or an empty Q for all months."""
+    condition = Q()
+    for month in months or ():
+        condition |= Q(**{f'{field}__gte': month, f'{field}__lt': next_month(month)})
+    return condition
+
+
+def compute_rollups(user_id=None, months=None, car_model=Car, sale_model=Sale, expense_model=MonthlyExpense):
+    """Aggregate the raw tables into ``{(user_id, month): values}``.
+
+    Limited to one user and/or a set of months when given. The model
+    arguments let data migrations pass their historical models.
+    """
+    cars = car_model.objects.filter(_month_filter('purchase_date', months))
+    sales = sale_model.objects.filter(_month_filter('sale_date', months))
+    expenses = expense_model.objects.filter(_month_filter('date', months))
+    if user_id is not None:
+        cars = cars.filter(user_id=user_id)
+        sales = sales.filter(car__user_id=user_id)
+        expenses = expenses.filter(user_id=user_id)
+
+    rows = defaultdict(_empty)
+    car_rows = (cars.order_by().annotate(month=TruncMonth('purchase_date'))
+                .values('user_id', 'month')
+                .annotate(bought=Count('id'), sold=Count('id', filter=Q(status='sold'))))
+    for row in car_rows:
+        key = (row['user_id'], row['month'])
+        rows[key]['cars_bought'] = row['bought']
+        rows[key]['cars_sold'] = row['sold']
+
+    sale_rows = (sales.order_by().annotate(month=TruncMonth('sale_date'))
+                 .values('car__user_id', 'month')
+                 .annotate(revenue=Sum('sale_value'), profit=Sum('partial_profit'),
+                           total=Sum('total_profit'), count=Count('id')))
+    for row in sale_rows:
+        key = (row['car__user_id'], row['month'])
+        rows[key]['revenue'] = row['revenue'] or Decimal('0.00')
+        rows[key]['partial_profit'] = row['profit'] or Decimal('0.00')
+        rows[key]['total_profit'] = row['total'] or Decimal('0.00')
+        rows[key]['sale_count'] = row['count']
+
+    expense_rows = (expenses.order_by().annotate(month=TruncMonth('date'))
+                    .values('user_id', 'month')
+                    .annotate(total=Sum('amount')))
+    for row in expense_rows:
+        rows[(row['user_id'], row['month'])]['expense_total'] = row['total'] or Decimal('0.00')
+    return rows
+
+
+def refresh_months(user_id, months):
+    """Recompute the rollup rows of ``user_id`` for ``months`` (dates inside the months).
+
+    Joins the caller's transaction when there is one, so the rollup commits
+    or rolls back together with the write that changed the raw rows.
+    """
+    months = sorted({month_start(month) for month in months if month})
+    if not months:
+        return
+    with transaction.atomic(savepoint=False):
+        rows = compute_rollups(user_id, months)
+        for month in months:
+            values = rows.get((user_id, month))
+            if values is None or not any(values.values()):
+                MonthlyRollup.objects.filter(user_id=user_id, month=month).delete()
+            else:
+                MonthlyRollup.objects.update_or_create(user_id=user_id, month=month, defaults=values)
+
+
+def rebuild(user_id=None, batch_size=2000):
+    """Replace the rollup rows (of one user, or everyone) with fresh aggregates; returns the row count."""
+    rows = compute_rollups(user_id)
+    with transaction.atomic():
+        existing = MonthlyRollup.objects.all()
+        if user_id is not None:
+            existing = existing.filter(user_id=user_id)
+        existing.delete()
+        MonthlyRollup.objects.bulk_create(
+            [MonthlyRollup(user_id=owner, month=month, **values) for (owner, month), values in rows.items()],
+            batch_size=batch_size,
+        )
+    return len(rows)
+
+
+def _raw_totals(user, ranges):
+    """Partial profit, total profit and expenses straight from the raw tables for ``(start, end)`` ``ranges``."""
+    sale_dates = Q()
+    expense_dates = Q()
+    for start, end in ranges:
+        sale_dates |= Q(sale_date__range=(start, end))
+        expense_dates |= Q(date__range=(start, end))
+    sales = Sale.objects.filter(sale_dates, car__user=user).profit_totals()
+    expenses = MonthlyExpense.objects.filter(expense_dates, user=user).aggregate(
+        total=Sum('amount'))['total'] or Decimal('0.00')
+    return sales['partial_profit'], sales['total_profit'], expenses
+
+
+def dashboard_totals(user, date_range=None):
+    """Dashboard figures for ``user`` from the monthly rollups.
+
+    Car counts always cover every month. Profit and expenses are limited
+    to ``date_range`` when given. Months fully inside the range come from
+    the rollups; the partial months at either edge are summed from the raw
+    tables for just those days.
+    """
+    rollups = list(MonthlyRollup.objects.filter(user=user).values('month', *ROLLUP_FIELDS))
+    totals = {
+        'total_cars': sum(row['cars_bought'] for row in rollups),
+        'sold_cars': sum(row['cars_sold'] for row in rollups),
+    }
+    totals['available_cars'] = totals['total_cars'] - totals['sold_cars']
+
+    profit = total_profit = expenses = Decimal('0.00')
+    if date_range is None:
+        for row in rollups:
+            profit += row['partial_profit']
+            total_profit += row['total_profit']
+            expenses += row['expense_total']
+    elif date_range[0] <= date_range[1]:
+        start, end = date_range
+        # الأشهر الكاملة داخل النطاق من الملخص
+        first_full = start if start.day == 1 else next_month(start)
+        after_full = month_start(end) if next_month(end) != end + timedelta(days=1) else next_month(end)
+        for row in rollups:
+            if first_full <= row['month'] < after_full:
+                profit += row['partial_profit']
+                total_profit += row['total_profit']
+                expenses += row['expense_total']
+        # أطراف النطاق (أجزاء من شهر) من الجداول مباشرة
+        edges = []
+        if first_full >= after_full:
+            edges.append((start, end))
+        else:
+            if start < first_full:
+                edges.append((start, first_full - timedelta(days=1)))
+            if after_full <= end:
+                edges.append((after_full, end))
+        if edges:
+            edge_profit, edge_total_profit, edge_expenses = _raw_totals(user, edges)
+            profit += edge_profit
+            total_profit += edge_total_profit
+            expenses += edge_expenses
+
+    totals['total_partial_profit'] = profit
+    totals['total_profit'] = total_profit
+    totals['total_expenses'] = expenses
+    totals['net_profit'] = profit - expenses
+    return totals
@@ -0,0 +1,172 @@
+"""
+البحث النصي الكامل عن السيارات عبر جدول SQLite FTS5 مع توحيد الكتابة العربية
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import CAR_TYPE_LABELS, Car
+
+FTS_TABLE = 'car_app_car_search'
+
+# أعمدة جدول البحث بعد rowid (= رقم السيارة). عمود المالك يحصر البحث في سيارات المستخدم
+FTS_COLUMNS = ('owner', 'name', 'car_type', 'chassis_number')
+
+# عدد النتائج التي تُرتب حسب درجة التطابق، وبقية النتائج تُعرض من الأحدث
+RANKED_RESULTS = 100
+
+# التشكيل وعلامة المد والتطويل تُحذف قبل الفهرسة والبحث
+_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+
+# أشكال الحرف الواحد تُوحّد حتى يجد "احمد" كلمة "أحمد" و"كامري" كلمة "كامرى"
+_LETTER_VARIANTS = str.maketrans({
+    'أ': 'ا',
+    'إ': 'ا',
+    'آ': 'ا',
+    'ٱ': 'ا',
+    'ى': 'ي',
+    'ئ': 'ي',
+    'ؤ': 'و',
+    'ة': 'ه',
+})
+
+_TOKEN = re.compile(r'\w+')
+
+_INSERT_SQL = (
+    f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FTS_COLUMNS)}) '
+    f'VALUES (%s, {", ".join(["%s"] * len(FTS_COLUMNS))})'
+)
+
+
+def normalize(text):
+    """Normalize Arabic/Latin text for indexing and querying."""
+    if not text:
+        return ''
+    text = _DIACRITICS.sub('', str(text))
+    return text.translate(_LETTER_VARIANTS).lower()
+
+
+def is_available():
+    """True when the database supports the FTS5 search table."""
+    return connection.vendor == 'sqlite'
+
+
+def _owner_token(user_id):
+    return f'u{user_id}'
+
+
+def match_expression(user_id, query):
+    """FTS5 MATCH expression: the user's cars containing every word of ``query`` as a prefix.
+
+    Returns an empty string when ``query`` has no searchable words.
+    """
+    tokens = _TOKEN.findall(normalize(query))
+    if not tokens:
+        return ''
+    words = ' '.join(f'"{token}"*' for token in tokens)
+    return f'owner:"{_owner_token(user_id)}" AND {{name car_type chassis_number}}:({words})'
+
+
+def _document(car_id, user_id, name, car_type, chassis_number):
+    return (
+        car_id,
+        _owner_token(user_id),
+        normalize(name),
+        normalize(f'{car_type} {CAR_TYPE_LABELS.get(car_type, "")}'),
+        normalize(chassis_number),
+    )
+
+
+def index_cars(cars):
+    """Insert or replace the search rows of ``cars`` (Car instances)."""
+    if not is_available():
+        return
+    rows = [_document(car.pk, car.user_id, car.name, car.car_type, car.chassis_number) for car in cars]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(_INSERT_SQL, rows)
+
+
+def remove_car(car_id):
+    remove_cars([car_id])
+
+
+def remove_cars(car_ids):
+    if not is_available() or not car_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(car_id,) for car_id in car_ids])
+
+
+def rebuild_index(batch_size=2000):
+    """Re-create every search row from the cars table; returns the row count."""
+    if not is_available():
+        return 0
+    rows = Car.objects.values_list('id', 'user_id', 'name', 'car_type', 'chassis_number').order_by()
+    count = 0
+    batch = []
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(_document(*row))
+            if len(batch) >= batch_size:
+                cursor.executemany(_INSERT_SQL, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(_INSERT_SQL, batch)
+            count += len(batch)
+    return count
+
+
+def ranked_ids(user_id, query, limit=RANKED_RESULTS):
+    """Ids of the best ``limit`` matches for ``query`` among the user's cars, best first."""
+    expression = match_expression(user_id, query)
+    if not expression:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rank LIMIT %s',
+            [expression, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def contains_cars(cars, query):
+    """``icontains`` search, for databases without FTS5 and for cars that are not indexed (the archive)."""
+    return cars.filter(Q(name__icontains=query) |
+                       Q(car_type__icontains=query) |
+                       Q(chassis_number__icontains=query))
+
+
+def search_cars(cars, user, query):
+    """Limit ``user``'s ``cars`` queryset to matches for ``query``, best matches first.
+
+    On SQLite the matches come from the FTS5 table through an ``IN``
+    subquery, so the plan does not depend on the rest of the filters. The
+    top ``RANKED_RESULTS`` matches (bm25) are ordered first, the rest newest
+    first. Other databases fall back to ``icontains``.
+    """
+    if not is_available():
+        return contains_cars(cars, query)
+
+    user_id = getattr(user, 'pk', user)
+    expression = match_expression(user_id, query)
+    if not expression:
+        return cars
+    cars = cars.filter(id__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [expression]
+    ))
+    ranked = ranked_ids(user_id, query)
+    if not ranked:
+        return cars.none()
+    search_rank = Case(
+        *[When(id=car_id, then=Value(position)) for position, car_id in enumerate(ranked)],
+        default=Value(len(ranked)),
+        output_field=IntegerField(),
+    )
+    return cars.annotate(search_rank=search_rank).order_by('search_rank', '-created_at')
@@ -0,0 +1,140 @@
+"""
+توليد بيانات تجريبية بأحجام قريبة من بيانات الإنتاج لقياس الأداء
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .models import Car, DataVersion, MonthlyExpense, Sale
+from .rollups import rebuild as rebuild_rollups
+from .search import index_cars
+
+CAR_NAMES = [
+    'تويوتا كامري',
+    'تويوتا لاند كروزر',
+    'تويوتا هايلكس',
+    'هيونداي سوناتا',
+    'هيونداي النترا',
+    'نيسان باترول',
+    'نيسان صني',
+    'كيا سبورتاج',
+    'كيا سيراتو',
+    'شيفروليه تاهو',
+    'فورد إكسبلورر',
+    'جي إم سي يوكن',
+    'لكزس LX570',
+    'مرسيدس E200',
+    'ميتسوبيشي باجيرو',
+    'هوندا أكورد',
+]
+
+EXPENSE_DESCRIPTIONS = [
+    'إيجار المعرض',
+    'رواتب الموظفين',
+    'فاتورة الكهرباء',
+    'رسوم جمركية',
+    'نقل وشحن',
+    'صيانة وإصلاح',
+    'إعلانات',
+    'تأمين',
+]
+
+# رموز الشركات المصنعة في أول ثلاثة أحرف من رقم الشاصي
+WMI_CODES = ['JTD', 'JTE', 'KMH', 'KNA', 'JN1', '1GC', '1FM', 'WDD', 'JMB', '1HG']
+
+CHASSIS_CHARS = 'ABCDEFGHJKLMNPRSTUVWXYZ0123456789'
+
+
+def chassis_number(rng, user_id, index):
+    """A 17 character VIN-like chassis number, unique per (user_id, index)."""
+    random_part = ''.join(rng.choice(CHASSIS_CHARS) for _ in range(4))
+    return f'{rng.choice(WMI_CODES)}{random_part}{user_id % 10000:04d}{index:06d}'
+
+
+def seed_user(user, cars, expenses, sales_ratio=0.6, batch_size=2000, rng=None, start=None):
+    """Bulk-insert ``cars`` cars (``sales_ratio`` of them sold) and ``expenses`` expenses for ``user``.
+
+    Rows are written with ``bulk_create`` in ``batch_size`` batches inside a
+    single transaction, then the search index, the monthly rollups and the
+    data version are brought up to date. Dates are spread over the
+    ``start``..today range.
+    """
+    rng = rng or random.Random(user.pk)
+    today = date.today()
+    start = start or today - timedelta(days=5 * 365)
+    span = max((today - start).days, 1)
+    car_types = [code for code, _ in Car.CAR_TYPE_CHOICES]
+    clearance_types = [code for code, _ in Car.CLEARANCE_CHOICES]
+    first_index = Car.objects.filter(user=user).count()
+
+    with transaction.atomic():
+        for offset in range(0, cars, batch_size):
+            batch = []
+            for index in range(first_index + offset, first_index + min(offset + batch_size, cars)):
+                batch.append(Car(
+                    user=user,
+                    name=rng.choice(CAR_NAMES),
+                    car_type=rng.choice(car_types),
+                    year=rng.randint(2005, today.year),
+                    chassis_number=chassis_number(rng, user.pk, index),
+                    purchase_date=start + timedelta(days=rng.randrange(span)),
+                    purchase_value=Decimal(rng.randrange(15000, 250000)),
+                    clearance_type=rng.choice(clearance_types),
+                    status='sold' if rng.random() < sales_ratio else 'available',
+                ))
+            Car.objects.bulk_create(batch, batch_size=batch_size)
+            # bulk_create لا يرسل إشارات الحفظ، لذلك يُحدّث فهرس البحث هنا
+            index_cars(batch)
+
+            sales = []
+            for car in batch:
+                if car.status != 'sold':
+                    continue
+                sale_date = min(car.purchase_date + timedelta(days=rng.randint(1, 180)), today)
+                sale_value = car.purchase_value * Decimal(rng.uniform(0.9, 1.3)).quantize(Decimal('0.01'))
+                sale = Sale(
+                    car=car,
+                    sale_date=sale_date,
+                    sale_value=sale_value.quantize(Decimal('0.01')),
+                    partial_profit=Decimal(rng.randrange(0, 5000)),
+                )
+                # bulk_create لا يستدعي save()، لذلك يُحسب الربح المخزن هنا
+                sale.total_profit = sale.compute_total_profit()
+                sales.append(sale)
+            Sale.objects.bulk_create(sales, batch_size=batch_size)
+
+        for offset in range(0, expenses, batch_size):
+            MonthlyExpense.objects.bulk_create([
+                MonthlyExpense(
+                    user=user,
+                    description=rng.choice(EXPENSE_DESCRIPTIONS),
+                    amount=Decimal(rng.randrange(100, 20000)),
+                    date=start + timedelta(days=rng.randrange(span)),
+                )
+                for _ in range(offset, min(offset + batch_size, expenses))
+            ], batch_size=batch_size)
+
+        # bulk_create لا يرسل إشارات الحفظ، لذلك يُعاد بناء الملخص الشهري للمستخدم
+        # وتُرفع نسخة البيانات حتى لا تُخدم ملفات التصدير وETag السابقة للتوليد
+        rebuild_rollups(user.pk)
+        DataVersion.bump(user.pk)
+
+
+def seed_users(count, cars, expenses, prefix='seed', password=None, **kwargs):
+    """Create ``count`` users named ``<prefix>_<n>`` and seed each of them."""
+    users = []
+    for n in range(count):
+        username = f'{prefix}_{n + 1}'
+        user, created = User.objects.get_or_create(username=username)
+        if created:
+            if password:
+                user.set_password(password)
+            else:
+                user.set_unusable_password()
+            user.save()
+        seed_user(user, cars, expenses, **kwargs)
+        users.append(user)
+    return users
@@ -0,0 +1,270 @@
+"""
+إشارات النماذج - تحديث رقم نسخة بيانات المستخدم وفهرس البحث والملخص الشهري عند أي تعديل
+"""
+import threading
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import rollups, search
+from .rollups import month_start
+from .models import Car, DataVersion, MonthlyExpense, Sale, Tombstone
+
+
+_local = threading.local()
+
+
+class BatchedUpdates:
+    """Derived-data work collected while a bulk operation changes many rows of one user."""
+
+    def __init__(self, user_id, tombstone_op='delete'):
+        self.user_id = user_id
+        self.tombstone_op = tombstone_op
+        self.months = set()
+        self.indexed = {}
+        self.removed = set()
+        self.tombstones = []
+        self.changed = False
+
+    def touch(self, *days):
+        """Record a change to the user's data in the months of ``days``."""
+        self.changed = True
+        self.months.update(day for day in days if day)
+
+    def index(self, cars):
+        self.changed = True
+        for car in cars:
+            self.indexed[car.pk] = car
+            self.removed.discard(car.pk)
+
+    def remove(self, car_ids):
+        self.changed = True
+        for car_id in car_ids:
+            self.indexed.pop(car_id, None)
+            self.removed.add(car_id)
+
+    def apply(self):
+        if not self.changed:
+            return
+        Tombstone.objects.bulk_create(self.tombstones)
+        search.remove_cars(sorted(self.removed))
+        search.index_cars(list(self.indexed.values()))
+        rollups.refresh_months(self.user_id, self.months)
+        DataVersion.bump(self.user_id)
+
+
+@contextmanager
+def batched_updates(user_id, tombstone_op='delete'):
+    """Collect the signal work for ``user_id``'s rows and apply it once on exit.
+
+    Inside the block the handlers below only record what changed; on a
+    clean exit the search index is updated in one pass, every touched
+    rollup month is recomputed once and the data version is bumped once.
+    Use it inside the bulk operation's transaction. ``bulk_create`` and
+    ``QuerySet.update`` send no signals, so callers record those rows on
+    the yielded batch themselves. Rows deleted in the block are logged
+    for sync with ``tombstone_op`` ("archive" when they were moved to the
+    archive rather than deleted).
+    """
+    batch = BatchedUpdates(user_id, tombstone_op)
+    _local.batch = batch
+    try:
+        yield batch
+    finally:
+        _local.batch = None
+    batch.apply()
+
+
+def _batch_for(instance):
+    """The active batch if ``instance`` belongs to its user (sales are assumed to), else None."""
+    batch = getattr(_local, 'batch', None)
+    if batch is None or getattr(instance, 'user_id', batch.user_id) != batch.user_id:
+        return None
+    return batch
+
+
+def _deleting_user(kwargs):
+    """True when the delete cascades from removing the user itself."""
+    origin = kwargs.get('origin')
+    return getattr(origin, 'model', type(origin)) is User
+
+
+def _sale_user_id(sale):
+    try:
+        return sale.car.user_id
+    except Car.DoesNotExist:
+        # السيارة حُذفت في نفس العملية وسيتم تحديث النسخة من خلالها
+        return None
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_delete, sender=Car)
+@receiver(post_save, sender=MonthlyExpense)
+@receiver(post_delete, sender=MonthlyExpense)
+def bump_owner_version(sender, instance, **kwargs):
+    batch = _batch_for(instance)
+    if batch:
+        batch.touch()
+    elif not _deleting_user(kwargs):
+        DataVersion.bump(instance.user_id)
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+def bump_sale_owner_version(sender, instance, **kwargs):
+    batch = _batch_for(instance)
+    if batch:
+        batch.touch()
+        return
+    if _deleting_user(kwargs):
+        return
+    user_id = _sale_user_id(instance)
+    if user_id is not None:
+        DataVersion.bump(user_id)
+
+
+@receiver(post_save, sender=Car)
+def index_car(sender, instance, **kwargs):
+    batch = _batch_for(instance)
+    if batch:
+        batch.index([instance])
+    else:
+        search.index_cars([instance])
+
+
+@receiver(post_delete, sender=Car)
+def unindex_car(sender, instance, **kwargs):
+    batch = _batch_for(instance)
+    if batch:
+        batch.remove([instance.pk])
+    else:
+        search.remove_car(instance.pk)
+
+
+# الحقول التي تحدد (المستخدم، الشهر) لكل نموذج في الملخص الشهري
+ROLLUP_KEYS = {
+    Car: ('user_id', 'purchase_date'),
+    Sale: ('car__user_id', 'sale_date'),
+    MonthlyExpense: ('user_id', 'date'),
+}
+
+
+def _rollup_day(instance):
+    return getattr(instance, ROLLUP_KEYS[type(instance)][1])
+
+
+def _loaded_rollup_day(instance):
+    """The row's date as loaded from (or last saved to) the database, without querying."""
+    if instance.pk is None:
+        return None
+    if hasattr(instance, '_loaded_rollup_day'):
+        return instance._loaded_rollup_day
+    # حقل التاريخ كان مؤجلاً (only/defer) عند التحميل
+    date_field = ROLLUP_KEYS[type(instance)][1]
+    return type(instance).objects.filter(pk=instance.pk).values_list(date_field, flat=True).first()
+
+
+def _rollup_key(instance):
+    if isinstance(instance, Sale):
+        return _sale_user_id(instance), instance.sale_date
+    user_field, date_field = ROLLUP_KEYS[type(instance)]
+    return getattr(instance, user_field), getattr(instance, date_field)
+
+
+@receiver(post_init, sender=Car)
+@receiver(post_init, sender=Sale)
+@receiver(post_init, sender=MonthlyExpense)
+def remember_rollup_day(sender, instance, **kwargs):
+    """Keep the date a row was loaded with, in case a save moves it to another month."""
+    date_field = ROLLUP_KEYS[sender][1]
+    # قراءة __dict__ مباشرة حتى لا يُحمّل حقل مؤجل باستعلام
+    if instance.pk is not None and date_field in instance.__dict__:
+        instance._loaded_rollup_day = instance.__dict__[date_field]
+
+
+def _refresh_rollups(keys):
+    months_by_user = {}
+    for user_id, day in keys:
+        if user_id is not None and day is not None:
+            months_by_user.setdefault(user_id, set()).add(day)
+    for user_id, days in months_by_user.items():
+        rollups.refresh_months(user_id, days)
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_save, sender=Sale)
+@receiver(post_save, sender=MonthlyExpense)
+def update_rollups_on_save(sender, instance, created=False, raw=False, **kwargs):
+    previous = None if created or raw else _loaded_rollup_day(instance)
+    instance._loaded_rollup_day = _rollup_day(instance)
+    batch = _batch_for(instance)
+    if batch:
+        batch.touch(_rollup_day(instance), previous)
+        return
+    keys = [_rollup_key(instance)]
+    if previous is not None and month_start(previous) != month_start(keys[0][1]):
+        # المالك لا يتغير بالتعديل، فالشهر القديم لنفس المستخدم
+        keys.append((keys[0][0], previous))
+    _refresh_rollups(keys)
+
+
+@receiver(post_delete, sender=Car)
+@receiver(post_delete, sender=Sale)
+@receiver(post_delete, sender=MonthlyExpense)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    batch = _batch_for(instance)
+    if batch:
+        batch.touch(_rollup_day(instance))
+    # حذف المستخدم يحذف ملخصاته معه
+    elif not _deleting_user(kwargs):
+        _refresh_rollups([_rollup_key(instance)])
+
+
+@receiver(post_save, sender=Car)
+def sync_sale_profit(sender, instance, raw=False, **kwargs):
+    """Keep the stored profit of the car's sale correct when its purchase value changes."""
+    if raw:
+        return
+    sale = (Sale.objects.filter(car_id=instance.pk)
+            .exclude(total_profit=F('sale_value') - instance.purchase_value)
+            .values_list('sale_date', flat=True).first())
+    if sale is None:
+        return
+    Sale.objects.filter(car_id=instance.pk).update(
+        total_profit=F('sale_value') - instance.purchase_value,
+        updated_at=timezone.now(),
+    )
+    batch = _batch_for(instance)
+    if batch:
+        batch.touch(sale)
+    else:
+        rollups.refresh_months(instance.user_id, [sale])
+
+
+TOMBSTONE_KINDS = {
+    Car: 'car',
+    Sale: 'sale',
+    MonthlyExpense: 'expense',
+}
+
+
+@receiver(post_delete, sender=Car)
+@receiver(post_delete, sender=Sale)
+@receiver(post_delete, sender=MonthlyExpense)
+def record_tombstone(sender, instance, **kwargs):
+    """Log the deletion so sync clients remove the row from their copy."""
+    batch = _batch_for(instance)
+    if batch:
+        batch.tombstones.append(Tombstone(
+            user_id=batch.user_id, kind=TOMBSTONE_KINDS[sender], op=batch.tombstone_op, object_id=instance.pk,
+        ))
+        return
+    if _deleting_user(kwargs):
+        return
+    user_id = _sale_user_id(instance) if sender is Sale else instance.user_id
+    if user_id is not None:
+        Tombstone.objects.create(user_id=user_id, kind=TOMBSTONE_KINDS[sender], object_id=instance.pk)
@@ -0,0 +1,47 @@
+"""
+محرك SQLite مع خياري init_command و transaction_mode من Django 5.1 لإصدار 4.2:
+أوامر PRAGMA تُنفذ على كل اتصال جديد، والمعاملات تبدأ بـ BEGIN IMMEDIATE فتنتظر القفل
+بدل خطأ "database is locked" عند الترقية من القراءة إلى الكتابة
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """The SQLite backend with the ``init_command`` and ``transaction_mode`` options.
+
+    ``init_command`` is one or more ``;``-separated statements run on every
+    new connection. ``transaction_mode`` is how ``atomic()`` starts its
+    transaction. A deferred ``BEGIN`` that reads and then writes fails at
+    once if another connection wrote in between, since SQLite cannot wait
+    for the lock there. ``IMMEDIATE`` takes the write lock up front and
+    waits for it for ``busy_timeout``. Both options behave as in Django
+    5.1, so this backend can be dropped on upgrade.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('init_command', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        init_command = self.settings_dict['OPTIONS'].get('init_command', '')
+        for statement in init_command.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+        return conn
+
+    @property
+    def transaction_mode(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        if mode is not None and mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f'transaction_mode must be one of {", ".join(TRANSACTION_MODES)}')
+        return mode and mode.upper()
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.transaction_mode
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
@@ -0,0 +1,128 @@
+"""
+المزامنة التزايدية لتطبيقات العمل دون اتصال - تُبث بصيغة NDJSON الصفوف التي أُضيفت أو عُدّلت
+أو حُذفت منذ المؤشر فقط، فتكلفة المزامنة بعدد التغييرات لا بحجم الجداول
+"""
+import base64
+import binascii
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .exports import ITERATOR_CHUNK_SIZE, RAW_EXPORTS
+from .filters import owned_sales
+from .models import Car, MonthlyExpense, Sale, Tombstone
+
+# المؤشر الجديد يرجع قليلاً إلى الوراء حتى لا تضيع تعديلات معاملة بدأت قبل المزامنة وانتهت بعدها؛
+# الصفوف داخل هذه النافذة قد تُرسل مرتين وعلى التطبيق اعتبار كل صف "إضافة أو استبدال"
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def _user_sales(user, since):
+    if since is None:
+        return Sale.objects.filter(car__user=user)
+    return owned_sales(Sale.objects.all(), user)
+
+
+# (نوع الصف، الاستعلام (المستخدم، منذ)، أعمدة التصدير الخام المستخدمة لنفس الجدول)
+SYNC_SOURCES = [
+    ('car', lambda user, since: Car.objects.filter(user=user), 'cars'),
+    ('sale', _user_sales, 'sales'),
+    ('expense', lambda user, since: MonthlyExpense.objects.filter(user=user), 'expenses'),
+]
+
+
+class InvalidSyncCursor(ValueError):
+    pass
+
+
+def encode_sync_cursor(moment):
+    return base64.urlsafe_b64encode(moment.isoformat().encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_sync_cursor(cursor):
+    """The aware datetime in ``cursor``; raises InvalidSyncCursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        moment = datetime.fromisoformat(base64.urlsafe_b64decode(padded).decode('ascii'))
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise InvalidSyncCursor(cursor)
+    if moment.tzinfo is None:
+        raise InvalidSyncCursor(cursor)
+    return moment
+
+
+def sync_columns(export_name):
+    """``(column, field)`` pairs of a raw export that are stored on the synced table itself."""
+    # الأعمدة المنسوخة من جدول آخر (مثل car__chassis_number في المبيعات) لا تُرسل: تعديلها لا يغيّر
+    # updated_at لهذا الجدول فتبقى نسخة التطبيق قديمة، والتطبيق يجدها في صف السيارة بـ car_id
+    return [(column, field) for column, field in RAW_EXPORTS[export_name].columns if '__' not in field]
+
+
+def changed_rows(kind, user, since=None):
+    """Rows of ``kind`` owned by ``user`` and changed at or after ``since`` (all rows when None)."""
+    for source_kind, queryset, export_name in SYNC_SOURCES:
+        if source_kind == kind:
+            rows = queryset(user, since)
+            if since is not None:
+                rows = rows.filter(updated_at__gte=since)
+            return rows.order_by('updated_at').values_list(*[field for _, field in sync_columns(export_name)])
+    raise KeyError(kind)
+
+
+def deleted_rows(user, since):
+    tombstones = Tombstone.objects.filter(user=user, deleted_at__gte=since).order_by('deleted_at')
+    return tombstones.values_list('kind', 'op', 'object_id')
+
+
+def tombstone_cutoff():
+    """Tombstones older than this are pruned, and cursors older than this need a full sync."""
+    return timezone.now() - timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+
+
+def cursor_expired(since):
+    """True when deletions since ``since`` may already have been pruned."""
+    return since < tombstone_cutoff()
+
+
+def prune_tombstones(dry_run=False):
+    """Delete the tombstones older than the retention window; return how many (would be) deleted."""
+    tombstones = Tombstone.objects.filter(deleted_at__lt=tombstone_cutoff())
+    if dry_run:
+        return tombstones.count()
+    return tombstones.delete()[0]
+
+
+def sync_lines(user, since, cursor):
+    """Stream the NDJSON sync for ``user`` since the datetime ``since`` (None for a full sync).
+
+    One line per changed row (``op`` "upsert" with the fields of its own
+    table; a sale refers to its car by ``car_id``), then one
+    per row removed since the cursor, and a final line with the ``cursor``
+    for the next sync. A removed row has ``op`` "delete" when it was
+    deleted, or "archive" when it was moved to the archive: it still
+    exists and is in the reports with ``?archive=1``, but it is no longer
+    synced, so the client drops it from its working copy (or keeps it as
+    read-only history) without treating it as deleted. A full sync has no
+    removals: the client replaces its whole copy.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for kind, _, export_name in SYNC_SOURCES:
+        columns = [column for column, _ in sync_columns(export_name)]
+        block = []
+        for row in changed_rows(kind, user, since).iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            block.append(encoder.encode({'type': kind, 'op': 'upsert', 'data': dict(zip(columns, row))}) + '\n')
+            if len(block) >= ITERATOR_CHUNK_SIZE:
+                yield ''.join(block)
+                block = []
+        if block:
+            yield ''.join(block)
+
+    if since is not None:
+        block = [encoder.encode({'type': kind, 'op': op, 'id': object_id}) + '\n'
+                 for kind, op, object_id in deleted_rows(user, since).iterator(chunk_size=ITERATOR_CHUNK_SIZE)]
+        if block:
+            yield ''.join(block)
+
+    yield encoder.encode({'type': 'cursor', 'cursor': cursor, 'full': since is None}) + '\n'
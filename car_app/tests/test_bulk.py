@@ -0,0 +1,121 @@
+"""
+العمليات الجماعية - نتيجة لكل عنصر مع نجاح الصالح منها رغم أخطاء غيره، ورفض الطلب كله إذا تجاوز الحد
+أو لم يكن بالشكل المتوقع
+"""
+import json
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from car_app.models import Car, MonthlyExpense, MonthlyRollup, Sale, Tombstone
+
+
+class BulkOperationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('bulk', password='secret')
+        cls.other = User.objects.create_user('other', password='secret')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def car(self, chassis, user=None, **fields):
+        return Car.objects.create(
+            user=user or self.user, name=chassis, car_type='sedan', year=2020, chassis_number=chassis,
+            purchase_date=date(2024, 1, 10), purchase_value=Decimal('10000'), clearance_type='purchase', **fields,
+        )
+
+    def post(self, name, payload):
+        return self.client.post(reverse(name), json.dumps(payload), content_type='application/json')
+
+    def statuses(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [result['status'] for result in response.json()['results']]
+
+    def test_sell_cars_with_partial_errors(self):
+        available = self.car('A')
+        other_users = self.car('B', user=self.other)
+        already_sold = self.car('C', status='sold')
+        sale = {'sale_date': '2024-02-05', 'sale_value': '15000', 'partial_profit': '500'}
+        response = self.post('api_bulk_sell_cars', {'items': [
+            {'car_id': available.pk, **sale},
+            {'car_id': available.pk, **sale},
+            {'car_id': other_users.pk, **sale},
+            {'car_id': already_sold.pk, **sale},
+            {'car_id': self.car('D').pk, 'sale_date': 'غداً', 'sale_value': '1'},
+            {'car_id': 999999, **sale},
+            'not an item',
+        ]})
+        self.assertEqual(self.statuses(response), ['sold', 'error', 'error', 'error', 'error', 'error', 'error'])
+        body = response.json()
+        self.assertEqual((body['succeeded'], body['failed']), (1, 6))
+        self.assertIn('sale_date', body['results'][4]['errors'])
+
+        created = Sale.objects.get(car=available)
+        self.assertEqual(body['results'][0]['id'], created.pk)
+        self.assertEqual(created.total_profit, Decimal('5000'))
+        available.refresh_from_db()
+        self.assertEqual(available.status, 'sold')
+        self.assertFalse(Sale.objects.filter(car=other_users).exists())
+        rollup = MonthlyRollup.objects.get(user=self.user, month=date(2024, 2, 1))
+        self.assertEqual((rollup.sale_count, rollup.revenue), (1, Decimal('15000')))
+
+    def test_delete_cars_dedupes_ids(self):
+        car = self.car('A')
+        sale = Sale.objects.create(car=car, sale_date=date(2024, 2, 5), sale_value=Decimal('12000'))
+        others = self.car('B', user=self.other)
+        response = self.post('api_bulk_delete_cars', {'ids': [car.pk, car.pk, others.pk, 999999]})
+        self.assertEqual(self.statuses(response), ['deleted', 'deleted', 'error', 'error'])
+        self.assertFalse(Car.objects.filter(pk=car.pk).exists())
+        self.assertFalse(Sale.objects.filter(car_id=car.pk).exists())
+        self.assertTrue(Car.objects.filter(pk=others.pk).exists())
+        self.assertEqual(set(Tombstone.objects.filter(user=self.user).values_list('kind', 'object_id')),
+                         {('car', car.pk), ('sale', sale.pk)})
+        self.assertFalse(MonthlyRollup.objects.filter(user=self.user).exists())
+
+    def test_add_and_delete_expenses(self):
+        response = self.post('api_bulk_add_expenses', {'items': [
+            {'description': 'إيجار', 'amount': '500', 'date': '2024-01-31'},
+            {'description': 'صيانة', 'amount': 'كثير', 'date': '2024-01-31'},
+            {'description': 'وقود', 'amount': '100', 'date': '2024-02-01'},
+            [],
+        ]})
+        self.assertEqual(self.statuses(response), ['created', 'error', 'created', 'error'])
+        results = response.json()['results']
+        self.assertIn('amount', results[1]['errors'])
+        ids = [results[0]['id'], results[2]['id']]
+        self.assertEqual(MonthlyExpense.objects.filter(user=self.user, pk__in=ids).count(), 2)
+        self.assertEqual(MonthlyRollup.objects.get(user=self.user, month=date(2024, 1, 1)).expense_total,
+                         Decimal('500'))
+
+        response = self.post('api_bulk_delete_expenses', {'ids': [ids[0], ids[0], 999999]})
+        self.assertEqual(self.statuses(response), ['deleted', 'deleted', 'error'])
+        self.assertEqual(list(MonthlyExpense.objects.filter(user=self.user).values_list('pk', flat=True)), [ids[1]])
+        self.assertFalse(MonthlyRollup.objects.filter(user=self.user, month=date(2024, 1, 1)).exists())
+
+    def test_item_limit(self):
+        with mock.patch('car_app.bulk.BULK_MAX_ITEMS', 2):
+            response = self.post('api_bulk_delete_expenses', {'ids': [1, 2, 3]})
+            self.assertEqual(response.status_code, 400)
+            response = self.post('api_bulk_add_expenses', {'items': [{}, {}, {}]})
+            self.assertEqual(response.status_code, 400)
+            response = self.post('api_bulk_delete_expenses', {'ids': [1, 2]})
+            self.assertEqual(response.status_code, 200)
+        self.assertFalse(MonthlyExpense.objects.exists())
+
+    def test_malformed_requests(self):
+        for name, body in [
+            ('api_bulk_sell_cars', 'not json'),
+            ('api_bulk_sell_cars', json.dumps({'ids': [1]})),
+            ('api_bulk_delete_cars', json.dumps({'ids': ['1']})),
+            ('api_bulk_delete_cars', json.dumps({'ids': [True]})),
+            ('api_bulk_add_expenses', json.dumps([{'description': 'x'}])),
+        ]:
+            with self.subTest(name=name, body=body):
+                response = self.client.post(reverse(name), body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
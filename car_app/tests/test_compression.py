@@ -0,0 +1,44 @@
+"""
+ضغط الاستجابات - ملفات التصدير والواجهات البرمجية تُضغط، والصفحات التي تحمل رمز CSRF تُرسل دون ضغط (BREACH)
+"""
+import gzip
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from car_app.models import MonthlyExpense
+
+
+@override_settings(COMPRESSION_MIN_BYTES=0)
+class CompressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('compress', password='secret')
+        MonthlyExpense.objects.bulk_create(
+            MonthlyExpense(user=cls.user, description=f'مصروف {i}', amount=Decimal('10.00'), date=date(2024, 1, 1))
+            for i in range(200)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_exports_are_compressed(self):
+        response = self.client.get(reverse('export_expenses_csv'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('مصروف 199', gzip.decompress(b''.join(response.streaming_content)).decode('utf-8-sig'))
+
+    def test_pages_with_csrf_token_are_not_compressed(self):
+        for name in ('add_expense', 'expenses_list'):
+            with self.subTest(name):
+                response = self.client.get(reverse(name), HTTP_ACCEPT_ENCODING='gzip, br')
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'csrfmiddlewaretoken')
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_pages_without_csrf_token_are_compressed(self):
+        response = self.client.get(reverse('dashboard'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotIn('csrfmiddlewaretoken', gzip.decompress(response.content).decode('utf-8'))
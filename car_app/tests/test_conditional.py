@@ -0,0 +1,89 @@
+"""
+الطلبات الشرطية - ETag و Last-Modified يتغيران مع كل تعديل على بيانات المستخدم، ويُرد 304 للنسخة الحالية فقط،
+ولا تصلح نسخة مستخدم لمستخدم آخر
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from car_app.models import DataVersion, MonthlyExpense
+
+URL_NAMES = ('export_expenses_csv', 'api_car_list')
+
+
+class ConditionalRequestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice', password='secret')
+        cls.bob = User.objects.create_user('bob', password='secret')
+        for user in (cls.alice, cls.bob):
+            MonthlyExpense.objects.create(user=user, description='إيجار', amount=Decimal('100.00'),
+                                          date=date(2024, 1, 1))
+
+    def get(self, user, name, **headers):
+        self.client.force_login(user)
+        return self.client.get(reverse(name), **headers)
+
+    def test_unchanged_data_returns_304(self):
+        for name in URL_NAMES:
+            with self.subTest(name):
+                first = self.get(self.alice, name)
+                self.assertEqual(first.status_code, 200)
+                self.assertIn('private', first['Cache-Control'])
+                again = self.get(self.alice, name, HTTP_IF_NONE_MATCH=first['ETag'])
+                self.assertEqual(again.status_code, 304)
+                again = self.get(self.alice, name, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+                self.assertEqual(again.status_code, 304)
+
+    def test_write_changes_etag(self):
+        for name in URL_NAMES:
+            with self.subTest(name):
+                before = self.get(self.alice, name)
+                MonthlyExpense.objects.create(user=self.alice, description='صيانة', amount=Decimal('50.00'),
+                                              date=date(2024, 2, 1))
+                after = self.get(self.alice, name, HTTP_IF_NONE_MATCH=before['ETag'])
+                self.assertEqual(after.status_code, 200)
+                self.assertNotEqual(after['ETag'], before['ETag'])
+
+    def test_write_changes_last_modified(self):
+        before = self.get(self.alice, 'export_expenses_csv')
+        # Last-Modified بدقة الثانية، فالتعديل التالي يُنقل ثانيتين إلى الأمام
+        MonthlyExpense.objects.filter(user=self.alice).delete()
+        DataVersion.objects.filter(user=self.alice).update(updated_at=timezone.now() + timedelta(seconds=2))
+        after = self.get(self.alice, 'export_expenses_csv', HTTP_IF_MODIFIED_SINCE=before['Last-Modified'])
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after['Last-Modified'], before['Last-Modified'])
+
+    def test_filters_change_etag(self):
+        self.client.force_login(self.alice)
+        plain = self.client.get(reverse('export_expenses_csv'))
+        filtered = self.client.get(reverse('export_expenses_csv'), {'start_date': '2024-01-01'},
+                                   HTTP_IF_NONE_MATCH=plain['ETag'])
+        self.assertEqual(filtered.status_code, 200)
+        self.assertNotEqual(filtered['ETag'], plain['ETag'])
+
+    def test_etag_never_matches_another_user(self):
+        # نفس رقم النسخة ونفس الرابط لمستخدمين مختلفين
+        DataVersion.objects.filter(user__in=[self.alice, self.bob]).update(version=7)
+        for name in URL_NAMES:
+            with self.subTest(name):
+                alice = self.get(self.alice, name)
+                bob = self.get(self.bob, name, HTTP_IF_NONE_MATCH=alice['ETag'])
+                self.assertEqual(bob.status_code, 200)
+                self.assertNotEqual(bob['ETag'], alice['ETag'])
+
+    def test_last_modified_of_another_user_is_not_reused(self):
+        alice = self.get(self.alice, 'export_expenses_csv')
+        DataVersion.objects.filter(user=self.bob).update(updated_at=timezone.now() + timedelta(seconds=2))
+        bob = self.get(self.bob, 'export_expenses_csv', HTTP_IF_MODIFIED_SINCE=alice['Last-Modified'])
+        self.assertEqual(bob.status_code, 200)
+
+        # مستخدم بلا أي تعديل ليس له Last-Modified فلا يُرد له 304 بتاريخ مستخدم آخر
+        carol = User.objects.create_user('carol', password='secret')
+        response = self.get(carol, 'export_expenses_csv', HTTP_IF_MODIFIED_SINCE=alice['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Last-Modified'))
@@ -0,0 +1,131 @@
+"""
+استيراد CSV/XLSX - القراءة المتدفقة على دفعات، وتقرير أخطاء كل صف برقم السطر والحقل دون إيقاف باقي الملف
+"""
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from openpyxl import Workbook
+
+from car_app.imports import CAR_COLUMNS, ImportFileError, import_file, read_rows
+from car_app.models import Car, MonthlyExpense, MonthlyRollup
+
+CAR_HEADER = ['name', 'car_type', 'year', 'chassis_number', 'purchase_date', 'purchase_value', 'clearance_type',
+              'status']
+
+
+def car_row(chassis, **overrides):
+    row = {
+        'name': f'سيارة {chassis}', 'car_type': 'sedan', 'year': '2020', 'chassis_number': chassis,
+        'purchase_date': '2024-01-15', 'purchase_value': '10000', 'clearance_type': 'purchase', 'status': '',
+    }
+    row.update(overrides)
+    return [row[column] for column in CAR_HEADER]
+
+
+def csv_upload(header, rows, name='data.csv'):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return SimpleUploadedFile(name, output.getvalue().encode('utf-8-sig'), content_type='text/csv')
+
+
+def xlsx_upload(header, rows, name='data.xlsx'):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    output = io.BytesIO()
+    workbook.save(output)
+    return SimpleUploadedFile(name, output.getvalue())
+
+
+class ImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('importer', password='secret')
+
+    def errors(self, result):
+        return [(error.line, error.field) for error in result.errors]
+
+    def test_rows_are_read_lazily(self):
+        rows = read_rows(csv_upload(CAR_HEADER, [car_row(f'L-{i}') for i in range(5)]), CAR_COLUMNS)
+        line, values = next(rows)
+        self.assertEqual(line, 2)
+        self.assertEqual(values['chassis_number'], 'L-0')
+        self.assertEqual(len(list(rows)), 4)
+
+    def test_streaming_import_in_batches(self):
+        upload = csv_upload(CAR_HEADER, [car_row(f'S-{i}', purchase_date=f'2024-0{1 + i % 3}-10')
+                                         for i in range(11)])
+        result = import_file(self.user, 'cars', upload, batch_size=4)
+        self.assertEqual((result.created, result.error_count), (11, 0))
+        self.assertEqual(Car.objects.filter(user=self.user).count(), 11)
+        rollups = dict(MonthlyRollup.objects.filter(user=self.user).values_list('month', 'cars_bought'))
+        self.assertEqual(rollups, {date(2024, 1, 1): 4, date(2024, 2, 1): 4, date(2024, 3, 1): 3})
+
+    def test_xlsx_import(self):
+        upload = xlsx_upload(['الوصف', 'القيمة', 'التاريخ'], [['إيجار', 500, date(2024, 1, 5)], ['صيانة', 'abc', None]])
+        result = import_file(self.user, 'expenses', upload, batch_size=1)
+        self.assertEqual(result.created, 1)
+        self.assertEqual(MonthlyExpense.objects.get(user=self.user).amount, Decimal('500'))
+        self.assertEqual(self.errors(result), [(3, 'amount'), (3, 'date')])
+
+    def test_row_errors_are_reported_and_other_rows_imported(self):
+        Car.objects.create(user=self.user, name='', car_type='sedan', year=2020, chassis_number='TAKEN',
+                           purchase_date=date(2024, 1, 1), purchase_value=Decimal('1'), clearance_type='purchase')
+        upload = csv_upload(CAR_HEADER, [
+            car_row('OK-1'),
+            car_row('BAD-YEAR', year='قديمة'),
+            car_row('TAKEN'),
+            car_row('OK-1'),
+            car_row('BAD-TYPE', car_type='boat'),
+            car_row('BAD-STATUS', status='lost'),
+            car_row('OK-2'),
+        ])
+        result = import_file(self.user, 'cars', upload, batch_size=3)
+        self.assertEqual(result.created, 2)
+        self.assertEqual(self.errors(result), [
+            (3, 'year'), (4, 'chassis_number'), (5, 'chassis_number'), (6, 'car_type'), (7, 'status'),
+        ])
+        self.assertEqual(set(Car.objects.filter(user=self.user).values_list('chassis_number', flat=True)),
+                         {'TAKEN', 'OK-1', 'OK-2'})
+
+    def test_status_column_is_imported(self):
+        upload = csv_upload(CAR_HEADER, [car_row('ST-1', status='مباع'), car_row('ST-2', status='sold'),
+                                         car_row('ST-3')])
+        result = import_file(self.user, 'cars', upload)
+        self.assertEqual(result.error_count, 0)
+        self.assertEqual(dict(Car.objects.filter(user=self.user).values_list('chassis_number', 'status')),
+                         {'ST-1': 'sold', 'ST-2': 'sold', 'ST-3': 'available'})
+
+    def test_reported_errors_are_capped(self):
+        upload = csv_upload(CAR_HEADER, [car_row(f'E-{i}', year='x') for i in range(5)])
+        with mock.patch('car_app.imports.MAX_REPORTED_ERRORS', 2):
+            result = import_file(self.user, 'cars', upload)
+        self.assertEqual((result.created, result.error_count, len(result.errors)), (0, 5, 2))
+
+    def test_unreadable_files(self):
+        with self.assertRaises(ImportFileError):
+            import_file(self.user, 'cars', SimpleUploadedFile('data.txt', b'x'))
+        with self.assertRaises(ImportFileError):
+            import_file(self.user, 'cars', csv_upload(['a', 'b'], [['1', '2']]))
+        with self.assertRaises(ImportFileError):
+            import_file(self.user, 'cars', SimpleUploadedFile('data.xlsx', b'not a zip'))
+
+    def test_import_view_shows_the_report(self):
+        self.client.force_login(self.user)
+        upload = csv_upload(CAR_HEADER, [car_row('V-1'), car_row('V-2', year='x')])
+        response = self.client.post(reverse('import_data'), {'kind': 'cars', 'file': upload})
+        self.assertEqual(response.status_code, 200)
+        result = response.context['result']
+        self.assertEqual((result.created, result.error_count), (1, 1))
+        self.assertContains(response, 'تقرير الاستيراد')
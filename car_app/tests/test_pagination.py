@@ -0,0 +1,108 @@
+"""
+ترقيم الصفحات بالمؤشر - المرور على كل الصفحات ذهاباً وإياباً دون تكرار أو فقد حتى مع تساوي مفتاح الترتيب،
+ورفض المؤشرات المعدّلة بـ 400
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from car_app.models import MonthlyExpense
+from car_app.pagination import (
+    MAX_PAGE_SIZE, PAGE_SIZE, InvalidCursor, decode_cursor, encode_cursor, ordering_for, page_size_from, paginate,
+)
+
+
+class PaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('pager', password='secret')
+        # تواريخ متكررة حتى تقع حدود الصفحات داخل مجموعات متساوية في مفتاح الترتيب
+        days = [1, 1, 1, 2, 2, 3, 3, 3, 3, 4]
+        MonthlyExpense.objects.bulk_create(
+            MonthlyExpense(user=cls.user, description=f'مصروف {i}', amount=Decimal('10.00'), date=date(2024, 1, day))
+            for i, day in enumerate(days)
+        )
+        cls.queryset = MonthlyExpense.objects.filter(user=cls.user)
+        cls.expected = list(cls.queryset.order_by('-date', '-id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def walk(self, page_size):
+        page = paginate(self.queryset, None, page_size)
+        pages = [page]
+        while page.next_cursor:
+            page = paginate(self.queryset, page.next_cursor, page_size)
+            pages.append(page)
+        return pages
+
+    def test_cursor_round_trip(self):
+        ordering = ordering_for(self.queryset)
+        values = [date(2024, 1, 3), 7]
+        cursor = encode_cursor(ordering, values, 'previous')
+        self.assertEqual(decode_cursor(cursor, ordering), ('previous', ['2024-01-03', 7]))
+
+    def test_ties_on_sort_key_are_not_skipped_or_repeated(self):
+        for page_size in (1, 2, 3, 4):
+            with self.subTest(page_size=page_size):
+                ids = [item.id for page in self.walk(page_size) for item in page.items]
+                self.assertEqual(ids, self.expected)
+
+    def test_previous_walks_back_to_the_first_page(self):
+        page = self.walk(3)[-1]
+        remaining = self.expected[:-len(page.items)]
+        back = []
+        while page.previous_cursor:
+            page = paginate(self.queryset, page.previous_cursor, 3)
+            back.append(page)
+        self.assertEqual([item.id for page in reversed(back) for item in page.items], remaining)
+        self.assertEqual([item.id for item in back[-1].items], self.expected[:3])
+
+    def test_edges(self):
+        first = paginate(self.queryset, None, 3)
+        self.assertIsNone(first.previous_cursor)
+        self.assertIsNotNone(first.next_cursor)
+
+        last = self.walk(3)[-1]
+        self.assertIsNone(last.next_cursor)
+        self.assertEqual([item.id for item in last.items], self.expected[9:])
+
+        everything = paginate(self.queryset, None, len(self.expected))
+        self.assertIsNone(everything.previous_cursor)
+        self.assertIsNone(everything.next_cursor)
+
+        empty = paginate(MonthlyExpense.objects.none(), None, 3)
+        self.assertEqual((empty.items, empty.next_cursor, empty.previous_cursor), ([], None, None))
+
+    def test_tampered_cursor_is_rejected(self):
+        ordering = ordering_for(self.queryset)
+        cursors = {
+            'garbage': 'not-a-cursor!',
+            'not json': 'bm90IGpzb24',
+            'other ordering': encode_cursor(['-created_at', '-id'], ['2024-01-01T00:00:00', 1], 'next'),
+            'wrong direction': encode_cursor(ordering, ['2024-01-01', 1], 'sideways'),
+            'wrong value type': encode_cursor(ordering, ['not-a-date', 1], 'next'),
+            'null value': encode_cursor(ordering, [None, 1], 'next'),
+        }
+        for label, cursor in cursors.items():
+            with self.subTest(label):
+                with self.assertRaises(InvalidCursor):
+                    paginate(self.queryset, cursor, 3)
+                response = self.client.get(reverse('expenses_list'), {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+
+    def test_api_tampered_cursor_returns_json_400(self):
+        response = self.client.get(reverse('api_car_list'), {'cursor': 'not-a-cursor!'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(page_size_from({}), PAGE_SIZE)
+        self.assertEqual(page_size_from({'page_size': 'abc'}), PAGE_SIZE)
+        self.assertEqual(page_size_from({'page_size': '0'}), 1)
+        self.assertEqual(page_size_from({'page_size': '-5'}), 1)
+        self.assertEqual(page_size_from({'page_size': str(MAX_PAGE_SIZE * 10)}), MAX_PAGE_SIZE)
+        self.assertEqual(page_size_from({'page_size': '7'}), 7)
@@ -0,0 +1,145 @@
+"""
+حدود عدد استعلامات SQL لكل صفحة - كل صفحة تُطلب ببيانات صغيرة ثم كبيرة، فيفشل الاختبار إذا تجاوزت
+حدها المُعلن أو ازداد عدد استعلاماتها مع عدد الصفوف (N+1)
+"""
+import logging
+import random
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from car_app.models import Car, ExportJob, MonthlyExpense, Sale
+from car_app.seeding import seed_user
+
+# أقصى عدد استعلامات مسموح لكل صفحة (طلب GET بمستخدم مسجل الدخول).
+# يشمل استعلامي الجلسة والمستخدم اللذين يضيفهما login_required، واستعلام رقم
+# نسخة البيانات في الصفحات التي تدعم الطلبات الشرطية.
+# كل مسار جديد يجب أن يُضاف هنا وإلا يفشل الاختبار.
+QUERY_BUDGETS = {
+    'dashboard': 3,
+    'login': 2,
+    'car_list': 3,
+    'export_cars_pdf': 5,
+    'export_cars_csv': 4,
+    'export_cars_ndjson': 4,
+    'add_car': 2,
+    'edit_car': 3,
+    'delete_car': 2,
+    'import_data': 2,
+    'add_sale': 3,
+    'sales_list': 3,
+    'export_sales_pdf': 5,
+    'export_sales_excel': 4,
+    'export_sales_csv': 4,
+    'export_sales_ndjson': 4,
+    'edit_sale': 4,
+    'export_full_report': 6,
+    'export_job_status': 3,
+    'export_job_download': 3,
+    'expenses_list': 4,
+    'add_expense': 2,
+    'delete_expense': 2,
+    'export_expenses_csv': 4,
+    'export_expenses_ndjson': 4,
+    'api_car_list': 4,
+    'api_sales_list': 4,
+    'api_analytics_pnl': 4,
+    'api_bulk_sell_cars': 2,
+    'api_bulk_delete_cars': 2,
+    'api_bulk_add_expenses': 2,
+    'api_bulk_delete_expenses': 2,
+    'api_sync': 5,
+}
+
+# مسارات لا تُفحص: لوحة الإدارة لها استعلاماتها الخاصة، والخروج ينهي جلسة الاختبار
+SKIPPED_URLS = {'logout'}
+
+# عدد السيارات (والمصروفات) في القياس الصغير والكبير
+SMALL_CARS = 20
+LARGE_CARS = 200
+
+
+def url_names(resolver=None):
+    """Names of every project URL pattern outside namespaced apps (admin)."""
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace:
+                continue
+            yield from url_names(pattern)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name
+
+
+def url_kwargs(user):
+    """Sample URL arguments pointing at objects owned by ``user``."""
+    job = ExportJob.objects.create(user=user, kind='sales_excel', params={})
+    return {
+        'car_id': Car.objects.filter(user=user, status='available').values_list('id', flat=True).first(),
+        'sale_id': Sale.objects.filter(car__user=user).values_list('id', flat=True).first(),
+        'expense_id': MonthlyExpense.objects.filter(user=user).values_list('id', flat=True).first(),
+        'job_id': job.id,
+    }
+
+
+def url_for(name, kwargs):
+    """``reverse(name)`` with the subset of ``kwargs`` the pattern takes."""
+    pattern = get_resolver().reverse_dict.getlist(name)
+    params = pattern[0][0][0][1] if pattern else []
+    return reverse(name, kwargs={param: kwargs[param] for param in params})
+
+
+def measure(client, url):
+    """Run a GET and consume the body; return (status, query count, SQL seconds)."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        close = getattr(response, 'close', None)
+        if close:
+            close()
+    sql_seconds = sum(float(q['time']) for q in queries.captured_queries)
+    return response.status_code, len(queries.captured_queries), sql_seconds
+
+
+@override_settings(EXPORT_CACHE_MAX_BYTES=0)
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = {}
+        for cars in (SMALL_CARS, LARGE_CARS):
+            user = User.objects.create(username=f'query_budget_{cars}')
+            seed_user(user, cars=cars, expenses=cars, rng=random.Random(cars))
+            cls.users[cars] = (user, url_kwargs(user))
+
+    def setUp(self):
+        # تحذيرات 404/405 المتوقعة (حذف بطلب GET، مهمة لم تنته بعد) لا تهم هنا
+        request_logger = logging.getLogger('django.request')
+        self.addCleanup(request_logger.setLevel, request_logger.level)
+        request_logger.setLevel(logging.ERROR)
+
+    def get(self, name, cars):
+        user, kwargs = self.users[cars]
+        self.client.force_login(user)
+        return measure(self.client, url_for(name, kwargs))
+
+    def test_every_url_has_a_budget(self):
+        missing = [name for name in url_names() if name not in SKIPPED_URLS and name not in QUERY_BUDGETS]
+        self.assertEqual(missing, [], 'مسارات بلا حد استعلامات مُعلن')
+
+    def test_views_stay_within_budget(self):
+        for name, budget in QUERY_BUDGETS.items():
+            with self.subTest(view=name):
+                status, small_count, _ = self.get(name, SMALL_CARS)
+                status, large_count, _ = self.get(name, LARGE_CARS)
+                self.assertLess(status, 500)
+                self.assertLessEqual(large_count, budget, f'{large_count} استعلام يتجاوز الحد {budget}')
+                self.assertLessEqual(
+                    large_count, small_count,
+                    f'عدد الاستعلامات يزداد مع عدد الصفوف ({small_count} -> {large_count})',
+                )
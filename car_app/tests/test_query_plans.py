@@ -0,0 +1,74 @@
+"""
+خطط استعلامات التصفية عبر EXPLAIN - كل استعلام يجب أن يستخدم فهرسه المركب بدل المسح الكامل للجدول
+"""
+import random
+import re
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from car_app.archive import archived_cars
+from car_app.filters import filter_cars, filter_expenses, filter_sales
+from car_app.models import ArchivedCar, ArchivedMonthlyExpense, ArchivedSale, Car, MonthlyExpense, Sale, Tombstone
+from car_app.seeding import seed_user
+from car_app.sync import changed_rows, deleted_rows
+
+# (الوصف، دالة التصفية، معاملات الطلب، الفهرس المتوقع (النموذج، الحقول))
+PLAN_CHECKS = [
+    ('cars: status + month/year', filter_cars, {'status': 'sold', 'month': '3', 'year': '2024'},
+     (Car, ['user', 'status', 'purchase_date'])),
+    ('cars: clearance', filter_cars, {'clearance': 'auction'},
+     (Car, ['user', 'clearance_type', 'created_at'])),
+    ('cars: year', filter_cars, {'year': '2024'},
+     (Car, ['user', 'purchase_date'])),
+    ('sales: date range', filter_sales, {'start_date': '2024-01-01', 'end_date': '2024-03-31'},
+     (Sale, ['sale_date'])),
+    ('expenses: date range', filter_expenses, {'start_date': '2024-01-01', 'end_date': '2024-03-31'},
+     (MonthlyExpense, ['user', 'date'])),
+    ('archive: cars year', archived_cars, {'year': '2024'}, (ArchivedCar, ['user', 'purchase_date'])),
+    ('archive: sales date range', lambda user, params: filter_sales(user, params, ArchivedSale.objects.all()),
+     {'start_date': '2024-01-01', 'end_date': '2024-03-31'}, (ArchivedSale, ['sale_date'])),
+    ('archive: expenses date range',
+     lambda user, params: filter_expenses(user, params, ArchivedMonthlyExpense.objects.all()),
+     {'start_date': '2024-01-01', 'end_date': '2024-03-31'}, (ArchivedMonthlyExpense, ['user', 'date'])),
+    ('sync: cars', lambda user, params: changed_rows('car', user, params['since']),
+     {'since': timezone.now() - timedelta(hours=1)}, (Car, ['user', 'updated_at'])),
+    ('sync: sales', lambda user, params: changed_rows('sale', user, params['since']),
+     {'since': timezone.now() - timedelta(hours=1)}, (Sale, ['updated_at'])),
+    ('sync: expenses', lambda user, params: changed_rows('expense', user, params['since']),
+     {'since': timezone.now() - timedelta(hours=1)}, (MonthlyExpense, ['user', 'updated_at'])),
+    ('sync: tombstones', lambda user, params: deleted_rows(user, params['since']),
+     {'since': timezone.now() - timedelta(hours=1)}, (Tombstone, ['user', 'deleted_at'])),
+]
+
+
+def index_name(model, fields):
+    for index in model._meta.indexes:
+        if list(index.fields) == fields:
+            return index.name
+    raise LookupError(f'{model.__name__} has no index on {fields}')
+
+
+def full_scans(plan):
+    """Tables read with a full table scan in a SQLite query plan."""
+    return re.findall(r'\bSCAN (\w+)(?! USING)', plan)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'يقرأ خطط SQLite فقط')
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='query_plans')
+        seed_user(cls.user, cars=500, expenses=500, rng=random.Random(0))
+
+    def test_filters_use_indexes(self):
+        for label, filter_func, params, expected in PLAN_CHECKS:
+            with self.subTest(label):
+                plan = filter_func(self.user, params).explain()
+                self.assertEqual(full_scans(plan), [], f'مسح كامل للجدول:\n{plan}')
+                self.assertIn(index_name(*expected), plan)
@@ -0,0 +1,104 @@
+"""
+الملخص الشهري - بعد كل إضافة وتعديل وحذف وبيع من الصفحات يجب أن تساوي صفوف الملخص وأرقام لوحة التحكم
+ما يُحسب مباشرة من الجداول الأصلية
+"""
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db.models import Count, Q, Sum
+from django.test import TestCase
+from django.urls import reverse
+
+from car_app.models import Car, MonthlyExpense, MonthlyRollup, Sale
+from car_app.rollups import ROLLUP_FIELDS, compute_rollups
+
+# نطاق يبدأ وينتهي في منتصف شهر حتى تُختبر أطراف النطاق مع الأشهر الكاملة
+DATE_RANGE = (date(2024, 1, 10), date(2024, 4, 15))
+
+
+class RollupConsistencyTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('rollups', password='secret')
+        self.client.force_login(self.user)
+
+    def car_data(self, chassis, purchase_date, purchase_value):
+        return {
+            'name': f'سيارة {chassis}', 'car_type': 'sedan', 'year': 2020, 'chassis_number': chassis,
+            'purchase_date': purchase_date, 'purchase_value': purchase_value, 'clearance_type': 'purchase',
+        }
+
+    def post(self, name, data=None, **kwargs):
+        response = self.client.post(reverse(name, kwargs=kwargs), data or {})
+        self.assertEqual(response.status_code, 302)
+
+    def raw_totals(self, date_range=None):
+        cars = Car.objects.filter(user=self.user).aggregate(total=Count('id'), sold=Count('id', filter=Q(status='sold')))
+        sales = Sale.objects.filter(car__user=self.user)
+        expenses = MonthlyExpense.objects.filter(user=self.user)
+        if date_range:
+            sales = sales.filter(sale_date__range=date_range)
+            expenses = expenses.filter(date__range=date_range)
+        sales = sales.aggregate(partial=Sum('partial_profit'), total=Sum('total_profit'))
+        partial = sales['partial'] or Decimal('0.00')
+        spent = expenses.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+        return {
+            'total_cars': cars['total'],
+            'sold_cars': cars['sold'],
+            'available_cars': cars['total'] - cars['sold'],
+            'total_partial_profit': partial,
+            'total_profit': sales['total'] or Decimal('0.00'),
+            'total_expenses': spent,
+            'net_profit': partial - spent,
+        }
+
+    def assertMatchesRaw(self):
+        stored = {
+            (row['user_id'], row['month']): {field: row[field] for field in ROLLUP_FIELDS}
+            for row in MonthlyRollup.objects.filter(user=self.user).values('user_id', 'month', *ROLLUP_FIELDS)
+        }
+        raw = {key: values for key, values in compute_rollups(self.user.pk).items() if any(values.values())}
+        self.assertEqual(stored, raw)
+
+        for date_range in (None, DATE_RANGE):
+            params = {'start_date': date_range[0], 'end_date': date_range[1]} if date_range else {}
+            context = self.client.get(reverse('dashboard'), params).context
+            shown = {key: context[key] for key in self.raw_totals()}
+            self.assertEqual(shown, self.raw_totals(date_range), date_range)
+
+    def test_dashboard_matches_raw_tables_after_each_change(self):
+        self.post('add_car', self.car_data('A-1', '2024-01-15', '10000'))
+        self.post('add_car', self.car_data('B-2', '2024-02-03', '20000'))
+        self.post('add_expense', {'description': 'إيجار', 'amount': '500', 'date': '2024-01-20'})
+        self.post('add_expense', {'description': 'صيانة', 'amount': '300', 'date': '2024-03-01'})
+        self.assertMatchesRaw()
+
+        car = Car.objects.get(chassis_number='A-1')
+        self.post('add_sale', {'sale_date': '2024-03-10', 'sale_value': '15000', 'partial_profit': '1000'},
+                  car_id=car.pk)
+        self.assertMatchesRaw()
+
+        # تعديل يغيّر شهر الشراء وقيمة الشراء (فيتغير ربح البيع المخزن)
+        self.post('edit_car', self.car_data('A-1', '2024-02-20', '12000'), car_id=car.pk)
+        self.assertEqual(Sale.objects.get(car=car).total_profit, Decimal('3000'))
+        self.assertMatchesRaw()
+
+        # تعديل ينقل البيع إلى شهر آخر
+        self.post('edit_sale', {'sale_date': '2024-04-05', 'sale_value': '16000', 'partial_profit': '1500'},
+                  sale_id=car.sale.pk)
+        self.assertMatchesRaw()
+
+        self.post('delete_expense', expense_id=MonthlyExpense.objects.get(description='صيانة').pk)
+        self.post('delete_car', car_id=Car.objects.get(chassis_number='B-2').pk)
+        self.assertMatchesRaw()
+
+        self.post('delete_car', car_id=car.pk)
+        self.assertMatchesRaw()
+
+    def test_failed_rollup_refresh_rolls_back_the_write(self):
+        with mock.patch('car_app.rollups.compute_rollups', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse('add_car'), self.car_data('C-3', '2024-01-15', '10000'))
+        self.assertFalse(Car.objects.filter(chassis_number='C-3').exists())
+        self.assertMatchesRaw()
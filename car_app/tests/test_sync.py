@@ -0,0 +1,131 @@
+"""
+المزامنة التزايدية - مزامنة كاملة ثم تغييرات فقط، إعادة إرسال نافذة التداخل، سجلات الحذف والأرشفة،
+رفض المؤشر المنتهي بـ 410 وحذف السجلات القديمة
+"""
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from car_app.archive import archive_user
+from car_app.models import Car, MonthlyExpense, Sale, Tombstone
+from car_app.sync import SYNC_OVERLAP, encode_sync_cursor, prune_tombstones
+
+
+@override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=90)
+class SyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('syncer', password='secret')
+        cls.other = User.objects.create_user('other', password='secret')
+        cls.car = Car.objects.create(
+            user=cls.user, name='كامري', car_type='sedan', year=2020, chassis_number='SYNC-1',
+            purchase_date=date(2020, 1, 10), purchase_value=Decimal('10000'), clearance_type='purchase', status='sold',
+        )
+        cls.sale = Sale.objects.create(car=cls.car, sale_date=date(2020, 2, 1), sale_value=Decimal('12000'))
+        cls.expense = MonthlyExpense.objects.create(user=cls.user, description='إيجار', amount=Decimal('500'),
+                                                    date=date(2024, 1, 1))
+        MonthlyExpense.objects.create(user=cls.other, description='غيره', amount=Decimal('1'), date=date(2024, 1, 1))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def sync(self, cursor=None):
+        response = self.client.get(reverse('api_sync'), {'since': cursor} if cursor else {})
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode('utf-8').splitlines()]
+        self.assertEqual(lines[-1]['type'], 'cursor')
+        self.assertEqual(lines[-1]['cursor'], response['X-Sync-Cursor'])
+        return lines[:-1], lines[-1]
+
+    def backdate(self, *rows, age=timedelta(hours=1)):
+        # تعديل قديم خارج نافذة التداخل
+        for row in rows:
+            type(row).objects.filter(pk=row.pk).update(updated_at=timezone.now() - age)
+
+    def ops(self, lines):
+        return {(line['type'], line['op'], line.get('id', line.get('data', {}).get('id'))) for line in lines}
+
+    def test_full_sync(self):
+        lines, cursor = self.sync()
+        self.assertTrue(cursor['full'])
+        self.assertEqual(self.ops(lines), {
+            ('car', 'upsert', self.car.pk), ('sale', 'upsert', self.sale.pk), ('expense', 'upsert', self.expense.pk),
+        })
+        sale = next(line['data'] for line in lines if line['type'] == 'sale')
+        # الأعمدة المنسوخة من السيارة لا تُرسل مع البيع
+        self.assertEqual(set(sale), {'id', 'car_id', 'sale_date', 'sale_value', 'total_profit', 'partial_profit'})
+
+    def test_incremental_sync_sends_changes_and_the_overlap_window(self):
+        self.backdate(self.car, self.sale, self.expense)
+        _, cursor = self.sync()
+        lines, next_cursor = self.sync(cursor['cursor'])
+        self.assertEqual(lines, [])
+        self.assertFalse(next_cursor['full'])
+
+        # تعديل قبل المؤشر بأقل من نافذة التداخل يُعاد إرساله (قد يكون من معاملة لم تنتهِ وقتها)
+        MonthlyExpense.objects.filter(pk=self.expense.pk).update(
+            updated_at=timezone.now() - SYNC_OVERLAP + timedelta(seconds=1))
+        self.car.purchase_value = Decimal('11000')
+        self.car.save()
+        lines, _ = self.sync(cursor['cursor'])
+        self.assertEqual(self.ops(lines), {
+            ('expense', 'upsert', self.expense.pk), ('car', 'upsert', self.car.pk),
+            # قيمة الشراء تغيّر الربح المخزن للبيع
+            ('sale', 'upsert', self.sale.pk),
+        })
+
+    def test_deletions_and_archives_are_sent_as_tombstones(self):
+        self.backdate(self.car, self.sale, self.expense)
+        _, cursor = self.sync()
+        archive_user(self.user.pk, date(2021, 1, 1))
+        expense_id = self.expense.pk
+        self.expense.delete()
+        lines, _ = self.sync(cursor['cursor'])
+        self.assertEqual(self.ops(lines), {
+            ('car', 'archive', self.car.pk), ('sale', 'archive', self.sale.pk), ('expense', 'delete', expense_id),
+        })
+        # سجلات الحذف لا تُرسل في المزامنة الكاملة
+        lines, _ = self.sync()
+        self.assertEqual(lines, [])
+
+    def test_expired_cursor_requires_full_sync(self):
+        cursor = encode_sync_cursor(timezone.now() - timedelta(days=91))
+        response = self.client.get(reverse('api_sync'), {'since': cursor})
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.json()['full_sync_required'])
+
+        lines, _ = self.sync(encode_sync_cursor(timezone.now() - timedelta(days=89)))
+        self.assertEqual(len(lines), 3)
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-a-cursor', encode_sync_cursor(timezone.now().replace(tzinfo=None))):
+            with self.subTest(cursor):
+                response = self.client.get(reverse('api_sync'), {'since': cursor})
+                self.assertEqual(response.status_code, 400)
+
+    def test_prune_tombstones(self):
+        expense_id = self.expense.pk
+        self.expense.delete()
+        old = Tombstone.objects.create(user=self.user, kind='car', object_id=12345)
+        Tombstone.objects.filter(pk=old.pk).update(deleted_at=timezone.now() - timedelta(days=91))
+        self.assertEqual(prune_tombstones(dry_run=True), 1)
+        self.assertTrue(Tombstone.objects.filter(pk=old.pk).exists())
+        self.assertEqual(prune_tombstones(), 1)
+        self.assertEqual(list(Tombstone.objects.values_list('kind', 'object_id')), [('expense', expense_id)])
+
+    def test_prune_tombstones_command(self):
+        old = Tombstone.objects.create(user=self.user, kind='car', object_id=12345)
+        Tombstone.objects.filter(pk=old.pk).update(deleted_at=timezone.now() - timedelta(days=91))
+        output = StringIO()
+        call_command('prune_tombstones', '--dry-run', stdout=output)
+        self.assertIn('1', output.getvalue())
+        self.assertTrue(Tombstone.objects.filter(pk=old.pk).exists())
+        call_command('prune_tombstones', stdout=StringIO())
+        self.assertFalse(Tombstone.objects.filter(pk=old.pk).exists())
@@ -23,6 +23,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'car_app.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,6 +60,37 @@ DATABASES = {
     }
 }
 
+# أوامر PRAGMA لكل اتصال SQLite جديد في إعدادات الإنتاج
+SQLITE_PRAGMAS = {
+    # القراء لا ينتظرون الكاتب والكاتب لا ينتظر القراء؛ الوضع يُحفظ في ملف القاعدة
+    'journal_mode': 'WAL',
+    # انتظار القفل حتى 5 ثوان قبل رفع خطأ "database is locked"
+    'busy_timeout': 5000,
+    # مع WAL لا تتلف القاعدة عند انقطاع الكهرباء، وقد تضيع آخر المعاملات فقط
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # بالسالب: الحجم بالكيلوبايت (64 ميجابايت لكل اتصال)
+    'cache_size': -64 * 1024,
+}
+
+# إعدادات SQLite للخادم متعدد العمليات، تُفعّل بـ CAR_APP_SQLITE_PRODUCTION=1 فقط:
+# WAL يغيّر ملفات القاعدة على القرص (ملفا -wal و -shm) والاتصالات الدائمة تُبقي الملف مفتوحاً،
+# وهذا غير مرغوب في بيئة التطوير والاختبارات. أمر benchmark_sqlite يقيسها مقابل الإعدادات الافتراضية
+SQLITE_PRODUCTION_DATABASE = {
+    # محرك sqlite3 مع init_command و transaction_mode (انظر car_app/sqlite_backend)
+    'ENGINE': 'car_app.sqlite_backend',
+    'OPTIONS': {
+        'init_command': ';'.join(f'PRAGMA {name} = {value}' for name, value in SQLITE_PRAGMAS.items()),
+        'transaction_mode': 'IMMEDIATE',
+    },
+    # اتصالات دائمة: لا يُفتح ملف القاعدة وتُعاد أوامر PRAGMA وتُفقد ذاكرة الصفحات مع كل طلب
+    'CONN_MAX_AGE': 600,
+    'CONN_HEALTH_CHECKS': True,
+}
+
+if os.environ.get('CAR_APP_SQLITE_PRODUCTION') == '1':
+    DATABASES['default'].update(SQLITE_PRODUCTION_DATABASE)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -86,6 +118,24 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# مهام التصدير التي بقيت "قيد التنفيذ" أطول من هذه المدة (بالثواني) يعاد تشغيلها
+EXPORT_JOB_STALE_AFTER = 30 * 60
+
+# ملفات التصدير الجاهزة تُحفظ هنا وتُحذف الأقدم استخداماً عند تجاوز الحجم الأقصى
+EXPORT_CACHE_DIR = os.path.join(BASE_DIR, 'export_cache')
+EXPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# سجلات الحذف للمزامنة تُحذف بعد هذا العدد من الأيام (أمر prune_tombstones يومياً)، والمؤشر الأقدم يتطلب مزامنة كاملة
+SYNC_TOMBSTONE_RETENTION_DAYS = 90
+
+# السيارات المباعة والمصروفات الأقدم من هذا العدد من الأيام تُنقل إلى الأرشيف (أمر archive_data)
+ARCHIVE_AFTER_DAYS = 2 * 365
+
+# ضغط الاستجابات: أصغر حجم يُضغط (بايت) وجودة Brotli ومستوى gzip
+COMPRESSION_MIN_BYTES = 860
+COMPRESSION_BROTLI_QUALITY = 5
+COMPRESSION_GZIP_LEVEL = 6
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = 'login'
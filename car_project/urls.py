@@ -3,7 +3,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
-from car_app import views
+from car_app import api, views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -14,6 +14,8 @@ urlpatterns = [
     # Car URLs
     path('cars/', views.car_list, name='car_list'),
     path('cars/export/pdf/', views.export_cars_pdf, name='export_cars_pdf'),
+    path('cars/export/csv/', views.export_cars_csv, name='export_cars_csv'),
+    path('cars/export/ndjson/', views.export_cars_ndjson, name='export_cars_ndjson'),
     path('cars/add/', views.add_car, name='add_car'),
     path('cars/<int:car_id>/edit/', views.edit_car, name='edit_car'),
     path('cars/<int:car_id>/delete/', views.delete_car, name='delete_car'),
@@ -23,16 +25,36 @@ urlpatterns = [
     path('sales/', views.sales_list, name='sales_list'),
     path('sales/export/pdf/', views.export_sales_pdf, name='export_sales_pdf'),
     path('sales/export/excel/', views.export_sales_excel, name='export_sales_excel'),
+    path('sales/export/csv/', views.export_sales_csv, name='export_sales_csv'),
+    path('sales/export/ndjson/', views.export_sales_ndjson, name='export_sales_ndjson'),
     path('sales/<int:sale_id>/edit/', views.edit_sale, name='edit_sale'),
     
+    # Reports URLs
+    path('reports/full/excel/', views.export_full_report, name='export_full_report'),
+    
+    # Export jobs URLs
+    path('exports/jobs/<int:job_id>/', views.export_job_status, name='export_job_status'),
+    path('exports/jobs/<int:job_id>/download/', views.export_job_download, name='export_job_download'),
+    
+    # Import URLs
+    path('import/', views.import_data, name='import_data'),
+    
     # Expenses URLs
     path('expenses/', views.expenses_list, name='expenses_list'),
     path('expenses/add/', views.add_expense, name='add_expense'),
+    path('expenses/export/csv/', views.export_expenses_csv, name='export_expenses_csv'),
+    path('expenses/export/ndjson/', views.export_expenses_ndjson, name='export_expenses_ndjson'),
     path('expenses/<int:expense_id>/delete/', views.delete_expense, name='delete_expense'),
     
     # API URLs
-    path('api/cars/', views.api_car_list, name='api_car_list'),
-    path('api/sales/', views.api_sales_list, name='api_sales_list'),
+    path('api/cars/', api.api_car_list, name='api_car_list'),
+    path('api/sales/', api.api_sales_list, name='api_sales_list'),
+    path('api/analytics/pnl/', views.api_analytics_pnl, name='api_analytics_pnl'),
+    path('api/bulk/cars/sell/', views.api_bulk_sell_cars, name='api_bulk_sell_cars'),
+    path('api/bulk/cars/delete/', views.api_bulk_delete_cars, name='api_bulk_delete_cars'),
+    path('api/bulk/expenses/add/', views.api_bulk_add_expenses, name='api_bulk_add_expenses'),
+    path('api/bulk/expenses/delete/', views.api_bulk_delete_expenses, name='api_bulk_delete_expenses'),
+    path('api/sync/', views.api_sync, name='api_sync'),
 ]
 
 if settings.DEBUG: